@@ -0,0 +1,105 @@
+'''
+Business: Sweep expired user sessions and token revocations in bounded batches so neither table grows forever
+Args: SESSION_SWEEP_BATCH, SESSION_SWEEP_MAX_BATCHES, SESSION_SWEEP_INTERVAL env vars; conn - PooledConnection
+Returns: sweep_expired_sessions() rows purged; session_metrics() purge counters and table size
+'''
+
+import os
+import threading
+import time
+from typing import Any, Dict
+
+import psycopg2
+
+SESSION_SWEEP_BATCH = int(os.environ.get('SESSION_SWEEP_BATCH', '1000'))
+SESSION_SWEEP_MAX_BATCHES = int(os.environ.get('SESSION_SWEEP_MAX_BATCHES', '10'))
+SESSION_SWEEP_INTERVAL = float(os.environ.get('SESSION_SWEEP_INTERVAL', '600'))
+
+# SKIP LOCKED leaves rows a concurrent logout or verify is deleting to that transaction
+SWEEP_BATCH_SQL = """
+    DELETE FROM user_sessions
+    WHERE ctid IN (
+        SELECT ctid FROM user_sessions
+        WHERE expires_at < NOW()
+        LIMIT %s
+        FOR UPDATE SKIP LOCKED
+    )
+"""
+
+SWEEP_LOCK_SQL = "SELECT pg_try_advisory_lock(hashtext('user_sessions_sweep'))"
+SWEEP_UNLOCK_SQL = "SELECT pg_advisory_unlock(hashtext('user_sessions_sweep'))"
+
+_stats: Dict[str, Any] = {'sweeps': 0, 'purged_total': 0, 'last_purged': 0, 'last_sweep_ms': 0.0}
+_stats_lock = threading.Lock()
+_next_sweep = 0.0
+
+
+def sweep_expired_sessions(conn: Any) -> int:
+    # Every batch commits on its own, so no sweep holds row locks for long; the advisory lock
+    # keeps concurrent invocations from sweeping the same rows
+    started = time.monotonic()
+    purged = 0
+
+    with conn.raw.cursor() as cur:
+        cur.execute(SWEEP_LOCK_SQL)
+        if not cur.fetchone()[0]:
+            conn.commit()
+            return 0
+
+        try:
+            for _ in range(SESSION_SWEEP_MAX_BATCHES):
+                cur.execute(SWEEP_BATCH_SQL, (SESSION_SWEEP_BATCH,))
+                deleted = cur.rowcount
+                conn.commit()
+                purged += deleted
+                if deleted < SESSION_SWEEP_BATCH:
+                    break
+
+            # Revocations of signed tokens are only needed until the token itself expires
+            cur.execute('DELETE FROM revoked_sessions WHERE expires_at < NOW()')
+            conn.commit()
+        finally:
+            conn.rollback()
+            cur.execute(SWEEP_UNLOCK_SQL)
+            conn.commit()
+
+    with _stats_lock:
+        _stats['sweeps'] += 1
+        _stats['purged_total'] += purged
+        _stats['last_purged'] = purged
+        _stats['last_sweep_ms'] = round((time.monotonic() - started) * 1000, 2)
+
+    return purged
+
+
+def maybe_sweep_sessions(conn: Any) -> int:
+    # Piggy-backed on session writes: at most one sweep per SESSION_SWEEP_INTERVAL per process
+    global _next_sweep
+
+    now = time.monotonic()
+    if now < _next_sweep:
+        return 0
+    _next_sweep = now + SESSION_SWEEP_INTERVAL
+
+    try:
+        return sweep_expired_sessions(conn)
+    except psycopg2.Error:
+        # The request's own work is already committed; a failed sweep is retried next interval
+        conn.rollback()
+        return 0
+
+
+def session_metrics(cur: Any) -> Dict[str, Any]:
+    cur.execute("""
+        SELECT c.reltuples::bigint AS estimated_rows,
+               (SELECT COUNT(*) FROM user_sessions WHERE expires_at < NOW()) AS expired_rows,
+               pg_table_size(c.oid) AS table_bytes,
+               pg_indexes_size(c.oid) AS index_bytes
+        FROM pg_class c
+        WHERE c.oid = 'user_sessions'::regclass
+    """)
+    row = cur.fetchone()
+    table = dict(row) if isinstance(row, dict) else dict(zip(('estimated_rows', 'expired_rows', 'table_bytes', 'index_bytes'), row))
+
+    with _stats_lock:
+        return {**_stats, **table}
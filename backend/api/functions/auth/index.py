@@ -0,0 +1,322 @@
+import json
+import os
+import sys
+import hashlib
+import secrets
+from typing import Dict, Any
+
+# core/ is vendored into every function by vendor_core.py, so each deploy unit imports its own copy
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.db import get_connection
+from core.auth import resolve_admin, evict_admin, evict_admin_token
+from core.http import respond
+from core.sessions import session_metrics, sweep_expired_sessions
+from core.rows import Column, RowSpec, JSON_AGG_LISTS, fetch_json, iso, join_json
+
+ADMIN_ROW = RowSpec('AdminRow', [
+    Column('id', 'id'),
+    Column('username', 'username'),
+    Column('role', 'role'),
+    Column('created_at', 'createdAt', iso)
+])
+
+def hash_password(password: str) -> str:
+    return hashlib.sha256(password.encode()).hexdigest()
+
+def generate_session_token() -> str:
+    return secrets.token_urlsafe(32)
+
+def escape_sql(value: str) -> str:
+    return value.replace("'", "''")
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    '''
+    Business: Authenticate users and manage admin sessions with token generation
+    Args: event - dict with httpMethod, body, headers
+          context - object with request_id attribute
+    Returns: HTTP response dict
+    '''
+    method: str = event.get('httpMethod', 'GET')
+    
+    if method == 'OPTIONS':
+        return {
+            'statusCode': 200,
+            'headers': {
+                'Access-Control-Allow-Origin': '*',
+                'Access-Control-Allow-Methods': 'GET, POST, DELETE, OPTIONS',
+                'Access-Control-Allow-Headers': 'Content-Type, X-Auth-Token',
+                'Access-Control-Max-Age': '86400'
+            },
+            'body': '',
+            'isBase64Encoded': False
+        }
+    
+    conn = get_connection()
+    cur = conn.cursor()
+    
+    try:
+        if method == 'GET':
+            params = event.get('queryStringParameters') or {}
+            action = params.get('action')
+            
+            if action == 'list_admins':
+                auth_token = event.get('headers', {}).get('X-Auth-Token') or event.get('headers', {}).get('x-auth-token')
+                
+                if not auth_token:
+                    return {
+                        'statusCode': 401,
+                        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                        'body': json.dumps({'error': 'Unauthorized'}),
+                        'isBase64Encoded': False
+                    }
+                
+                admin = resolve_admin(cur, auth_token)
+                
+                if not admin or admin.username != 'Xuna':
+                    return {
+                        'statusCode': 403,
+                        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                        'body': json.dumps({'error': 'Super admin access required'}),
+                        'isBase64Encoded': False
+                    }
+                
+                if JSON_AGG_LISTS:
+                    cur.execute(ADMIN_ROW.json_agg_sql('FROM admin_users', 'created_at DESC'))
+                    admins_list = fetch_json(cur)
+                else:
+                    cur.execute(f"SELECT {ADMIN_ROW.select_list} FROM admin_users ORDER BY created_at DESC")
+                    admins_list = ADMIN_ROW.to_dicts(cur.fetchall())
+                
+                return respond(event, join_json({'admins': admins_list}))
+            
+            if action == 'session_stats':
+                auth_token = event.get('headers', {}).get('X-Auth-Token') or event.get('headers', {}).get('x-auth-token')
+                
+                if not resolve_admin(cur, auth_token):
+                    return {
+                        'statusCode': 403,
+                        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                        'body': json.dumps({'error': 'Admin access required'}),
+                        'isBase64Encoded': False
+                    }
+                
+                return {
+                    'statusCode': 200,
+                    'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                    'body': json.dumps(session_metrics(cur)),
+                    'isBase64Encoded': False
+                }
+        
+        elif method == 'POST':
+            body_data = json.loads(event.get('body', '{}'))
+            action = body_data.get('action')
+            
+            if action == 'create_admin':
+                auth_token = event.get('headers', {}).get('X-Auth-Token') or event.get('headers', {}).get('x-auth-token')
+                
+                if not auth_token:
+                    return {
+                        'statusCode': 401,
+                        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                        'body': json.dumps({'error': 'Unauthorized'}),
+                        'isBase64Encoded': False
+                    }
+                
+                admin = resolve_admin(cur, auth_token)
+                
+                if not admin or admin.username != 'Xuna':
+                    return {
+                        'statusCode': 403,
+                        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                        'body': json.dumps({'error': 'Super admin access required'}),
+                        'isBase64Encoded': False
+                    }
+                
+                new_username = body_data.get('username')
+                new_password = body_data.get('password')
+                
+                if not new_username or not new_password:
+                    return {
+                        'statusCode': 400,
+                        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                        'body': json.dumps({'error': 'Username and password required'}),
+                        'isBase64Encoded': False
+                    }
+                
+                hashed_password = hash_password(new_password)
+                
+                cur.execute(
+                    f"INSERT INTO admin_users (username, password_hash, role) VALUES ('{escape_sql(new_username)}', '{hashed_password}', 'admin') RETURNING id"
+                )
+                admin_id = cur.fetchone()[0]
+                conn.commit()
+                
+                return {
+                    'statusCode': 200,
+                    'headers': {
+                        'Content-Type': 'application/json',
+                        'Access-Control-Allow-Origin': '*'
+                    },
+                    'body': json.dumps({'success': True, 'adminId': admin_id}),
+                    'isBase64Encoded': False
+                }
+            
+            if action == 'sweep_sessions':
+                auth_token = event.get('headers', {}).get('X-Auth-Token') or event.get('headers', {}).get('x-auth-token')
+                
+                if not resolve_admin(cur, auth_token):
+                    return {
+                        'statusCode': 403,
+                        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                        'body': json.dumps({'error': 'Admin access required'}),
+                        'isBase64Encoded': False
+                    }
+                
+                purged = sweep_expired_sessions(conn)
+                
+                return {
+                    'statusCode': 200,
+                    'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                    'body': json.dumps({'success': True, 'purged': purged, **session_metrics(cur)}),
+                    'isBase64Encoded': False
+                }
+            
+            if action == 'logout':
+                auth_token = event.get('headers', {}).get('X-Auth-Token') or event.get('headers', {}).get('x-auth-token')
+                
+                if auth_token:
+                    cur.execute(
+                        "UPDATE admin_users SET session_token = NULL WHERE session_token = %s",
+                        (auth_token,)
+                    )
+                    conn.commit()
+                    evict_admin_token(auth_token)
+                
+                return {
+                    'statusCode': 200,
+                    'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                    'body': json.dumps({'success': True}),
+                    'isBase64Encoded': False
+                }
+            
+            username = body_data.get('username', '')
+            password = body_data.get('password', '')
+            
+            if not username or not password:
+                return {
+                    'statusCode': 400,
+                    'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                    'body': json.dumps({'success': False, 'error': 'Username and password required'}),
+                    'isBase64Encoded': False
+                }
+            
+            hashed_password = hash_password(password)
+            print(f"Login attempt - Username: {username}, Password hash: {hashed_password}")
+            
+            cur.execute(
+                f"SELECT id, username, role, password_hash FROM admin_users WHERE username = '{escape_sql(username)}'"
+            )
+            user_data = cur.fetchone()
+            
+            if user_data:
+                print(f"User found - DB hash: {user_data[3]}, Match: {user_data[3] == hashed_password}")
+            else:
+                print(f"User not found: {username}")
+            
+            if user_data and user_data[3] == hashed_password:
+                session_token = generate_session_token()
+                
+                cur.execute(
+                    f"UPDATE admin_users SET session_token = '{session_token}' WHERE id = {user_data[0]}"
+                )
+                conn.commit()
+                evict_admin(user_data[0])
+                
+                return {
+                    'statusCode': 200,
+                    'headers': {
+                        'Content-Type': 'application/json',
+                        'Access-Control-Allow-Origin': '*'
+                    },
+                    'body': json.dumps({
+                        'success': True,
+                        'username': user_data[1],
+                        'role': user_data[2],
+                        'token': session_token
+                    }),
+                    'isBase64Encoded': False
+                }
+            else:
+                return {
+                    'statusCode': 401,
+                    'headers': {
+                        'Content-Type': 'application/json',
+                        'Access-Control-Allow-Origin': '*'
+                    },
+                    'body': json.dumps({'success': False, 'error': 'Неверный логин или пароль'}),
+                    'isBase64Encoded': False
+                }
+        
+        elif method == 'DELETE':
+            body_data = json.loads(event.get('body', '{}'))
+            action = body_data.get('action')
+            
+            if action == 'delete_admin':
+                auth_token = event.get('headers', {}).get('X-Auth-Token') or event.get('headers', {}).get('x-auth-token')
+                
+                if not auth_token:
+                    return {
+                        'statusCode': 401,
+                        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                        'body': json.dumps({'error': 'Unauthorized'}),
+                        'isBase64Encoded': False
+                    }
+                
+                admin = resolve_admin(cur, auth_token)
+                
+                if not admin or admin.username != 'Xuna':
+                    return {
+                        'statusCode': 403,
+                        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                        'body': json.dumps({'error': 'Super admin access required'}),
+                        'isBase64Encoded': False
+                    }
+                
+                admin_id = body_data.get('adminId')
+                
+                cur.execute(f"SELECT username FROM admin_users WHERE id = {admin_id}")
+                target_admin = cur.fetchone()
+                
+                if target_admin and target_admin[0] == 'Xuna':
+                    return {
+                        'statusCode': 403,
+                        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                        'body': json.dumps({'error': 'Cannot delete super admin'}),
+                        'isBase64Encoded': False
+                    }
+                
+                cur.execute(f"DELETE FROM admin_users WHERE id = {admin_id}")
+                conn.commit()
+                evict_admin(int(admin_id))
+                
+                return {
+                    'statusCode': 200,
+                    'headers': {
+                        'Content-Type': 'application/json',
+                        'Access-Control-Allow-Origin': '*'
+                    },
+                    'body': json.dumps({'success': True}),
+                    'isBase64Encoded': False
+                }
+        
+        return {
+            'statusCode': 405,
+            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+            'body': json.dumps({'error': 'Method not allowed'}),
+            'isBase64Encoded': False
+        }
+    
+    finally:
+        cur.close()
+        conn.close()
\ No newline at end of file
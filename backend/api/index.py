@@ -0,0 +1,102 @@
+import importlib.util
+import json
+import os
+import re
+import sys
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+GATEWAY_DIR = os.path.dirname(os.path.abspath(__file__))
+# vendor_core.py copies core/ and the six function handlers into this deploy unit
+FUNCTIONS_DIR = os.path.join(GATEWAY_DIR, 'functions')
+sys.path.insert(0, GATEWAY_DIR)
+
+from core.aio import run_sync
+
+FUNCTIONS = ('auth', 'register', 'schedule', 'settings', 'teams', 'user-auth')
+
+Handler = Callable[[Dict[str, Any], Any], Dict[str, Any]]
+AsyncHandler = Callable[[Dict[str, Any], Any], Awaitable[Dict[str, Any]]]
+
+
+def load_function(name: str) -> Any:
+    # Each function keeps its own entry point; loading them into one interpreter means they
+    # share core's connection pool, prepared statements and caches
+    path = os.path.join(FUNCTIONS_DIR, name, 'index.py')
+    spec = importlib.util.spec_from_file_location(f'{name.replace("-", "_")}_index', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+MODULES = {name: load_function(name) for name in FUNCTIONS}
+
+ROUTES: Dict[str, Handler] = {name: module.handler for name, module in MODULES.items()}
+ASYNC_ROUTES: Dict[str, AsyncHandler] = {
+    name: module.async_handler for name, module in MODULES.items() if hasattr(module, 'async_handler')
+}
+
+# Longest names first, so /user-auth is never routed to auth
+ROUTE_PATTERN = re.compile(
+    r'^/(?:api/)?(' + '|'.join(re.escape(name) for name in sorted(ROUTES, key=len, reverse=True)) + r')(?=/|$)(.*)$'
+)
+
+
+def resolve_route(event: Dict[str, Any]) -> Optional[Tuple[str, Dict[str, Any]]]:
+    path = (event.get('path') or event.get('url') or '/').split('?', 1)[0]
+    params = event.get('queryStringParameters') or {}
+
+    match = ROUTE_PATTERN.match(path)
+    if match:
+        name, path = match.group(1), match.group(2) or '/'
+    elif params.get('fn') in ROUTES:
+        # Platforms that give the function a single URL route with ?fn=<function>; the parameter is
+        # dropped so handlers and their cache keys see the same query as behind their own URL
+        name = params['fn']
+        params = {key: value for key, value in params.items() if key != 'fn'}
+    else:
+        return None
+
+    return name, {**event, 'path': path, 'queryStringParameters': params}
+
+
+def unknown_function() -> Dict[str, Any]:
+    return {
+        'statusCode': 404,
+        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+        'body': json.dumps({'error': 'Unknown function'}),
+        'isBase64Encoded': False
+    }
+
+
+def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    '''
+    Business: Single entry point serving all six backend functions from one warm container
+    Args: event - dict with httpMethod, path /<function>/... or queryStringParameters fn=<function>
+          context - object with request_id attribute
+    Returns: HTTP response dict of the routed function; 404 for an unknown function
+    '''
+    route = resolve_route(event)
+    
+    if route is None:
+        return unknown_function()
+    
+    name, routed_event = route
+    return ROUTES[name](routed_event, context)
+
+
+async def async_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    '''
+    Business: asyncio entry point for self-hosting - functions with an async_handler() variant are awaited,
+              the others run their sync handler() on the event loop's default executor
+    Args: event, context - same as handler()
+    Returns: HTTP response dict of the routed function; 404 for an unknown function
+    '''
+    route = resolve_route(event)
+    
+    if route is None:
+        return unknown_function()
+    
+    name, routed_event = route
+    if name in ASYNC_ROUTES:
+        return await ASYNC_ROUTES[name](routed_event, context)
+    return await run_sync(ROUTES[name], routed_event, context)
@@ -0,0 +1,141 @@
+'''
+Business: Declarative column specs that drive both SELECT column lists and JSON encoding of rows
+Args: Column(name, key, convert) per selected column; JSON_ENCODER env var ('orjson' or 'json');
+      JSON_AGG_LISTS env var ('true' lets PostgreSQL build list bodies with json_agg)
+Returns: RowSpec with select_list, a compact tuple row type, to_dict/to_dicts and json_agg_sql;
+         dumps() and join_json() for response bodies
+'''
+
+import json
+import os
+from collections import namedtuple
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+JSON_ENCODER = os.environ.get('JSON_ENCODER', 'orjson')
+USE_ORJSON = orjson is not None and JSON_ENCODER == 'orjson'
+JSON_AGG_LISTS = os.environ.get('JSON_AGG_LISTS', 'false') == 'true'
+
+
+class Column(NamedTuple):
+    name: str
+    key: str
+    convert: Optional[Callable[[Any], Any]] = None
+
+
+def iso(value: Any) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def text(value: Any) -> str:
+    return str(value)
+
+
+def flag(value: Any) -> bool:
+    return value if value is not None else False
+
+
+def array(value: Any) -> List[Any]:
+    return value if value else []
+
+
+# SQL producing the same JSON value as each converter; isoformat() drops a zero fraction, so does the CASE
+SQL_CONVERTERS = {
+    iso: '''CASE WHEN date_trunc('second', {0}) = {0} THEN to_char({0}, 'YYYY-MM-DD"T"HH24:MI:SS')
+                 ELSE to_char({0}, 'YYYY-MM-DD"T"HH24:MI:SS.US') END''',
+    text: '{0}::text',
+    flag: 'COALESCE({0}, false)',
+    array: "COALESCE({0}, '{{}}')"
+}
+
+
+class RowSpec:
+    __slots__ = ('name', 'columns', 'names', 'keys', 'select_list', 'row_type', '_positions', '_tuple_mapper', '_dict_mapper')
+
+    def __init__(self, name: str, columns: Sequence[Column]):
+        self.name = name
+        self.columns = tuple(columns)
+        self.names = tuple(c.name for c in self.columns)
+        self.keys = tuple(c.key for c in self.columns)
+        self.select_list = ', '.join(self.names)
+        # namedtuple instances carry no per-row __dict__, so they cost no more than the fetched tuple
+        self.row_type = namedtuple(name, self.names)
+        self._positions = {n: i for i, n in enumerate(self.names)}
+        self._tuple_mapper = self._compile(lambda i, c: f'r[{i}]')
+        self._dict_mapper = self._compile(lambda i, c: f'r[{c.name!r}]')
+
+    def _compile(self, access: Callable[[int, Column], str]) -> Callable[[Any], Dict[str, Any]]:
+        # Generated like namedtuple: one dict display per spec runs as fast as a hand-written mapper
+        namespace: Dict[str, Any] = {}
+        items = []
+        for i, c in enumerate(self.columns):
+            value = access(i, c)
+            if c.convert:
+                namespace[f'convert_{i}'] = c.convert
+                value = f'convert_{i}({value})'
+            items.append(f'{c.key!r}: {value}')
+        exec(f'def to_dict(r):\n    return {{{", ".join(items)}}}', namespace)
+        return namespace['to_dict']
+
+    def json_object_sql(self) -> str:
+        pairs = []
+        for c in self.columns:
+            value = SQL_CONVERTERS[c.convert].format(c.name) if c.convert else c.name
+            pairs.append(f"'{c.key}', {value}")
+        return f"json_build_object({', '.join(pairs)})"
+
+    def json_agg_sql(self, from_sql: str, order_by: str) -> str:
+        # ::text keeps psycopg2 from decoding the aggregate, so the handler passes the bytes through as-is
+        return (f"SELECT COALESCE(json_agg({self.json_object_sql()} ORDER BY {order_by}), '[]')::text AS body "
+                f"{from_sql}")
+
+    def index(self, name: str) -> int:
+        return self._positions[name]
+
+    def without(self, name: str, *names: str) -> 'RowSpec':
+        dropped = {name, *names}
+        return RowSpec(self.name + 'Partial', [c for c in self.columns if c.name not in dropped])
+
+    def row(self, values: Any) -> Any:
+        if isinstance(values, dict):
+            values = [values[n] for n in self.names]
+        return self.row_type._make(values)
+
+    def to_dict(self, row: Any) -> Dict[str, Any]:
+        if isinstance(row, dict):
+            return self._dict_mapper(row)
+        return self._tuple_mapper(row)
+
+    def to_dicts(self, rows: Sequence[Any]) -> List[Dict[str, Any]]:
+        if not rows:
+            return []
+        to_dict = self._dict_mapper if isinstance(rows[0], dict) else self._tuple_mapper
+        return [to_dict(row) for row in rows]
+
+
+def dumps(value: Any) -> str:
+    if USE_ORJSON:
+        return orjson.dumps(value).decode()
+    return json.dumps(value)
+
+
+class RawJson(NamedTuple):
+    text: str
+
+
+def fetch_json(cur: Any) -> RawJson:
+    row = cur.fetchone()
+    return RawJson(row['body'] if isinstance(row, dict) else row[0])
+
+
+def join_json(fragments: Dict[str, Any]) -> str:
+    # Values that are already JSON text (from json_agg_sql) are spliced in, everything else is encoded
+    parts = []
+    for key, value in fragments.items():
+        encoded = value.text if isinstance(value, RawJson) else dumps(value)
+        parts.append(f'{json.dumps(key)}: {encoded}')
+    return '{' + ', '.join(parts) + '}'
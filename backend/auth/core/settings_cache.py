@@ -0,0 +1,70 @@
+'''
+Business: In-process cache of the settings table with parsed values and a short TTL
+Args: SETTINGS_CACHE_TTL env var (seconds); cur - any cursor of a pooled connection
+Returns: get_setting() typed values; invalidate_settings() after writes
+'''
+
+import json
+import os
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from core.statements import execute_prepared, register_statement
+
+SETTINGS_CACHE_TTL = float(os.environ.get('SETTINGS_CACHE_TTL', '5'))
+
+ALL_SETTINGS = register_statement(
+    'all_settings',
+    'SELECT key, value FROM settings'
+)
+
+_cache: Tuple[float, Dict[str, Any]] = (0.0, {})
+
+
+def parse_setting(value: str) -> Any:
+    if value == 'true':
+        return True
+    if value == 'false':
+        return False
+
+    if value[:1] in ('{', '['):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value
+
+    return value
+
+
+def cached_settings() -> Optional[Dict[str, Any]]:
+    loaded_at, settings = _cache
+    if time.monotonic() - loaded_at < SETTINGS_CACHE_TTL:
+        return settings
+    return None
+
+
+def store_settings(rows: Iterable[Tuple[str, str]]) -> Dict[str, Any]:
+    global _cache
+
+    settings = {key: parse_setting(value) for key, value in rows}
+    _cache = (time.monotonic(), settings)
+    return settings
+
+
+def get_settings(cur: Any) -> Dict[str, Any]:
+    settings = cached_settings()
+    if settings is not None:
+        return settings
+
+    with cur.connection.cursor() as plain_cur:
+        execute_prepared(plain_cur, ALL_SETTINGS)
+        return store_settings(plain_cur.fetchall())
+
+
+def get_setting(cur: Any, key: str, default: Any = None) -> Any:
+    return get_settings(cur).get(key, default)
+
+
+def invalidate_settings() -> None:
+    global _cache
+    _cache = (0.0, {})
@@ -0,0 +1,73 @@
+'''
+Business: Registry of named server-side prepared statements for hot queries
+Args: statements are registered once at import time with $1..$n placeholders
+Returns: execute_prepared() - PREPAREs on first use per pooled connection, then EXECUTEs
+'''
+
+import threading
+from typing import Any, Dict, Sequence
+
+_registry: Dict[str, str] = {}
+_stats: Dict[str, Dict[str, int]] = {}
+_stats_lock = threading.Lock()
+
+
+def register_statement(name: str, sql: str) -> str:
+    existing = _registry.get(name)
+    if existing is not None and existing != sql:
+        raise ValueError(f'Prepared statement {name} is already registered with different SQL')
+
+    _registry[name] = sql
+    return name
+
+
+def _count(name: str, field: str) -> None:
+    with _stats_lock:
+        counters = _stats.setdefault(name, {'hits': 0, 'prepares': 0})
+        counters[field] += 1
+
+
+def execute_prepared(cur: Any, name: str, params: Sequence[Any] = ()) -> None:
+    prepared = cur.connection.prepared_statements
+    if name in prepared:
+        _count(name, 'hits')
+    else:
+        cur.execute(f'PREPARE {name} AS {_registry[name]}')
+        prepared.add(name)
+        _count(name, 'prepares')
+
+    if params:
+        placeholders = ', '.join(['%s'] * len(params))
+        cur.execute(f'EXECUTE {name} ({placeholders})', tuple(params))
+    else:
+        cur.execute(f'EXECUTE {name}')
+
+
+def statement_sql(name: str) -> str:
+    return _registry[name]
+
+
+def statement_stats() -> Dict[str, Dict[str, int]]:
+    with _stats_lock:
+        return {name: dict(counters) for name, counters in _stats.items()}
+
+
+ADMIN_BY_TOKEN = register_statement(
+    'admin_by_token',
+    'SELECT id, role, username FROM admin_users WHERE session_token = $1'
+)
+
+USER_SESSION_BY_TOKEN = register_statement(
+    'user_session_by_token',
+    'SELECT telegram, user_type, expires_at FROM user_sessions WHERE session_token = $1'
+)
+
+COLLECTION_VERSION = register_statement(
+    'collection_version',
+    'SELECT version FROM data_versions WHERE collection = $1'
+)
+
+COLLECTION_VERSIONS = register_statement(
+    'collection_versions',
+    'SELECT collection, version FROM data_versions WHERE collection = ANY($1)'
+)
@@ -1,10 +1,26 @@
 import json
 import os
+import sys
 import hashlib
 import secrets
-import psycopg2
 from typing import Dict, Any
 
+# core/ is vendored into every function by vendor_core.py, so each deploy unit imports its own copy
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.db import get_connection
+from core.auth import resolve_admin, evict_admin, evict_admin_token
+from core.http import respond
+from core.sessions import session_metrics, sweep_expired_sessions
+from core.rows import Column, RowSpec, JSON_AGG_LISTS, fetch_json, iso, join_json
+
+ADMIN_ROW = RowSpec('AdminRow', [
+    Column('id', 'id'),
+    Column('username', 'username'),
+    Column('role', 'role'),
+    Column('created_at', 'createdAt', iso)
+])
+
 def hash_password(password: str) -> str:
     return hashlib.sha256(password.encode()).hexdigest()
 
@@ -36,7 +52,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'isBase64Encoded': False
         }
     
-    conn = psycopg2.connect(os.environ['DATABASE_URL'])
+    conn = get_connection()
     cur = conn.cursor()
     
     try:
@@ -55,13 +71,9 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                         'isBase64Encoded': False
                     }
                 
-                cur.execute(
-                    "SELECT username FROM admin_users WHERE session_token = %s",
-                    (auth_token,)
-                )
-                admin = cur.fetchone()
+                admin = resolve_admin(cur, auth_token)
                 
-                if not admin or admin[0] != 'Xuna':
+                if not admin or admin.username != 'Xuna':
                     return {
                         'statusCode': 403,
                         'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
@@ -69,25 +81,30 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                         'isBase64Encoded': False
                     }
                 
-                cur.execute(
-                    "SELECT id, username, role, created_at FROM admin_users ORDER BY created_at DESC"
-                )
-                admins = cur.fetchall()
+                if JSON_AGG_LISTS:
+                    cur.execute(ADMIN_ROW.json_agg_sql('FROM admin_users', 'created_at DESC'))
+                    admins_list = fetch_json(cur)
+                else:
+                    cur.execute(f"SELECT {ADMIN_ROW.select_list} FROM admin_users ORDER BY created_at DESC")
+                    admins_list = ADMIN_ROW.to_dicts(cur.fetchall())
                 
-                admins_list = [{
-                    'id': a[0],
-                    'username': a[1],
-                    'role': a[2],
-                    'createdAt': a[3].isoformat() if a[3] else None
-                } for a in admins]
+                return respond(event, join_json({'admins': admins_list}))
+            
+            if action == 'session_stats':
+                auth_token = event.get('headers', {}).get('X-Auth-Token') or event.get('headers', {}).get('x-auth-token')
+                
+                if not resolve_admin(cur, auth_token):
+                    return {
+                        'statusCode': 403,
+                        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                        'body': json.dumps({'error': 'Admin access required'}),
+                        'isBase64Encoded': False
+                    }
                 
                 return {
                     'statusCode': 200,
-                    'headers': {
-                        'Content-Type': 'application/json',
-                        'Access-Control-Allow-Origin': '*'
-                    },
-                    'body': json.dumps({'admins': admins_list}),
+                    'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                    'body': json.dumps(session_metrics(cur)),
                     'isBase64Encoded': False
                 }
         
@@ -106,13 +123,9 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                         'isBase64Encoded': False
                     }
                 
-                cur.execute(
-                    "SELECT username FROM admin_users WHERE session_token = %s",
-                    (auth_token,)
-                )
-                admin = cur.fetchone()
+                admin = resolve_admin(cur, auth_token)
                 
-                if not admin or admin[0] != 'Xuna':
+                if not admin or admin.username != 'Xuna':
                     return {
                         'statusCode': 403,
                         'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
@@ -149,6 +162,44 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                     'isBase64Encoded': False
                 }
             
+            if action == 'sweep_sessions':
+                auth_token = event.get('headers', {}).get('X-Auth-Token') or event.get('headers', {}).get('x-auth-token')
+                
+                if not resolve_admin(cur, auth_token):
+                    return {
+                        'statusCode': 403,
+                        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                        'body': json.dumps({'error': 'Admin access required'}),
+                        'isBase64Encoded': False
+                    }
+                
+                purged = sweep_expired_sessions(conn)
+                
+                return {
+                    'statusCode': 200,
+                    'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                    'body': json.dumps({'success': True, 'purged': purged, **session_metrics(cur)}),
+                    'isBase64Encoded': False
+                }
+            
+            if action == 'logout':
+                auth_token = event.get('headers', {}).get('X-Auth-Token') or event.get('headers', {}).get('x-auth-token')
+                
+                if auth_token:
+                    cur.execute(
+                        "UPDATE admin_users SET session_token = NULL WHERE session_token = %s",
+                        (auth_token,)
+                    )
+                    conn.commit()
+                    evict_admin_token(auth_token)
+                
+                return {
+                    'statusCode': 200,
+                    'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                    'body': json.dumps({'success': True}),
+                    'isBase64Encoded': False
+                }
+            
             username = body_data.get('username', '')
             password = body_data.get('password', '')
             
@@ -180,6 +231,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                     f"UPDATE admin_users SET session_token = '{session_token}' WHERE id = {user_data[0]}"
                 )
                 conn.commit()
+                evict_admin(user_data[0])
                 
                 return {
                     'statusCode': 200,
@@ -221,12 +273,9 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                         'isBase64Encoded': False
                     }
                 
-                cur.execute(
-                    f"SELECT username FROM admin_users WHERE session_token = '{escape_sql(auth_token)}'"
-                )
-                admin = cur.fetchone()
+                admin = resolve_admin(cur, auth_token)
                 
-                if not admin or admin[0] != 'Xuna':
+                if not admin or admin.username != 'Xuna':
                     return {
                         'statusCode': 403,
                         'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
@@ -249,6 +298,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 
                 cur.execute(f"DELETE FROM admin_users WHERE id = {admin_id}")
                 conn.commit()
+                evict_admin(int(admin_id))
                 
                 return {
                     'statusCode': 200,
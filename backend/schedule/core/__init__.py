@@ -0,0 +1,5 @@
+'''
+Shared code for backend functions: connection pool and other per-container state
+that survives between invocations of a warm function instance.
+backend/core is the source; vendor_core.py copies it into every function directory.
+'''
@@ -0,0 +1,116 @@
+'''
+Business: Shared asyncpg pool and async counterparts of the core lookups for the asyncio handler variants
+Args: DATABASE_URL env var; AIO_POOL_MIN, AIO_POOL_MAX env vars; asyncpg is optional - without it
+      async_handler() variants fall back to the sync handler on a worker thread
+Returns: get_pool() pool of the running event loop, get_read_pool() the one core.replica routes a GET to; fetch_prepared/fetchrow_prepared/fetchval_prepared run
+         registered statements; resolve_admin_async() and get_settings_async() share the sync caches
+'''
+
+import asyncio
+import os
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from core.auth import AdminSession, apply_admin_version, cached_admin, remember_admin, revocations_checked
+from core.replica import DATABASE_READ_URL, mark_replica_down, read_dsn, request_token
+from core.settings_cache import ALL_SETTINGS, cached_settings, store_settings
+from core.statements import ADMIN_BY_TOKEN, COLLECTION_VERSION, statement_sql
+
+try:
+    import asyncpg
+except ImportError:
+    asyncpg = None
+
+AIO_ENABLED = asyncpg is not None
+AIO_POOL_MIN = int(os.environ.get('AIO_POOL_MIN', '1'))
+AIO_POOL_MAX = int(os.environ.get('AIO_POOL_MAX', '10'))
+
+# asyncpg pools are bound to the loop that created them; one pool task per running loop and server
+_pools: Dict[Tuple[asyncio.AbstractEventLoop, str], 'asyncio.Task[Any]'] = {}
+
+
+async def _open_pool(dsn: str) -> Any:
+    return await asyncpg.create_pool(dsn, min_size=AIO_POOL_MIN, max_size=AIO_POOL_MAX)
+
+
+async def get_pool(dsn: Optional[str] = None) -> Any:
+    key = (asyncio.get_running_loop(), dsn or os.environ['DATABASE_URL'])
+    task = _pools.get(key)
+    if task is None:
+        # Concurrent first requests await the same task instead of opening a pool each
+        task = _pools[key] = key[0].create_task(_open_pool(key[1]))
+    try:
+        return await asyncio.shield(task)
+    except Exception:
+        _pools.pop(key, None)
+        raise
+
+
+async def get_read_pool(event: Dict[str, Any]) -> Any:
+    # Same routing as core.replica.get_routed_connection; the lag probe is blocking, so it runs off the loop
+    if not DATABASE_READ_URL:
+        return await get_pool()
+
+    dsn = await asyncio.get_running_loop().run_in_executor(None, read_dsn, request_token(event))
+    if dsn == DATABASE_READ_URL:
+        try:
+            return await get_pool(dsn)
+        except (OSError, asyncpg.PostgresError):
+            mark_replica_down()
+    return await get_pool()
+
+
+async def close_pools() -> None:
+    loop = asyncio.get_running_loop()
+    for key in [key for key in _pools if key[0] is loop]:
+        task = _pools.pop(key)
+        if task.done() and task.exception() is None:
+            await task.result().close()
+
+
+# Registered statements already use $n placeholders; asyncpg prepares and caches them per connection
+async def fetch_prepared(db: Any, name: str, params: Sequence[Any] = ()) -> List[Any]:
+    return await db.fetch(statement_sql(name), *params)
+
+
+async def fetchrow_prepared(db: Any, name: str, params: Sequence[Any] = ()) -> Any:
+    return await db.fetchrow(statement_sql(name), *params)
+
+
+async def fetchval_prepared(db: Any, name: str, params: Sequence[Any] = ()) -> Any:
+    return await db.fetchval(statement_sql(name), *params)
+
+
+async def resolve_admin_async(db: Any, token: Optional[str]) -> Optional[AdminSession]:
+    if not token:
+        return None
+
+    admin = cached_admin(token)
+    if admin is not None:
+        return admin
+
+    if not revocations_checked():
+        apply_admin_version(await fetchval_prepared(db, COLLECTION_VERSION, ('admin_users',)) or 0)
+        admin = cached_admin(token)
+        if admin is not None:
+            return admin
+
+    row = await fetchrow_prepared(db, ADMIN_BY_TOKEN, (token,))
+    if not row:
+        return None
+    return remember_admin(token, row)
+
+
+async def get_settings_async(db: Any) -> Dict[str, Any]:
+    settings = cached_settings()
+    if settings is not None:
+        return settings
+    return store_settings(await fetch_prepared(db, ALL_SETTINGS))
+
+
+async def get_setting_async(db: Any, key: str, default: Any = None) -> Any:
+    return (await get_settings_async(db)).get(key, default)
+
+
+async def run_sync(handler: Callable[[Dict[str, Any], Any], Dict[str, Any]], event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    # Paths without an async variant keep their psycopg2 code on the loop's default executor
+    return await asyncio.get_running_loop().run_in_executor(None, handler, event, context)
@@ -0,0 +1,166 @@
+'''
+Business: Admin exports of whole tables as NDJSON or CSV without materialising the result set in Python
+Args: conn - PooledConnection; spec - RowSpec of the exported entity; EXPORT_ITERSIZE env var
+Returns: response dict with the export body, gzip-compressed chunk by chunk when the client accepts it
+'''
+
+import base64
+import json
+import os
+import uuid
+import zlib
+from typing import Any, Dict, Iterator, List, Sequence, Union
+
+from core.http import accepted_encoding, GZIP_LEVEL
+from core.rows import RowSpec, dumps
+
+EXPORT_ITERSIZE = int(os.environ.get('EXPORT_ITERSIZE', '1000'))
+
+EXPORT_CONTENT_TYPES = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv; charset=utf-8'
+}
+
+
+class ExportError(ValueError):
+    pass
+
+
+class ExportBody:
+    '''File-like sink: chunks are compressed as they arrive, so only the compressed body is kept.'''
+
+    def __init__(self, compress: bool):
+        self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31) if compress else None
+        self._parts: List[bytes] = []
+
+    def write(self, data: Union[str, bytes]) -> None:
+        if isinstance(data, str):
+            data = data.encode()
+        if self._compressor is not None:
+            data = self._compressor.compress(data)
+        if data:
+            self._parts.append(data)
+
+    def finish(self) -> bytes:
+        if self._compressor is not None:
+            self._parts.append(self._compressor.flush())
+        return b''.join(self._parts)
+
+
+def iter_rows(conn: Any, spec: RowSpec, from_sql: str, params: Sequence[Any] = ()) -> Iterator[tuple]:
+    # A named cursor keeps the result set on the server and fetches EXPORT_ITERSIZE rows per round trip
+    cur = conn.raw.cursor(name=f'export_{uuid.uuid4().hex}')
+    cur.itersize = EXPORT_ITERSIZE
+    try:
+        cur.execute(f'SELECT {spec.select_list} {from_sql}', params)
+        yield from cur
+    finally:
+        cur.close()
+
+
+def csv_array_item(value: Any) -> str:
+    text = str(value)
+    if text == '' or text.upper() == 'NULL' or any(ch in text for ch in '{},"\\ \t\n'):
+        return '"' + text.replace('\\', '\\\\').replace('"', '\\"') + '"'
+    return text
+
+
+def csv_value(value: Any) -> str:
+    # Match PostgreSQL's CSV output so the cursor and COPY paths produce the same file:
+    # NULL is an empty field, an empty string is quoted
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        text = 't' if value else 'f'
+    elif isinstance(value, list):
+        text = '{' + ','.join(csv_array_item(v) for v in value) + '}'
+    elif isinstance(value, dict):
+        text = json.dumps(value, ensure_ascii=False)
+    else:
+        text = str(value)
+
+    if text == '' or any(ch in text for ch in ',"\r\n'):
+        return '"' + text.replace('"', '""') + '"'
+    return text
+
+
+def write_ndjson(body: ExportBody, spec: RowSpec, rows: Iterator[tuple]) -> None:
+    to_dict = spec.to_dict
+    batch: List[str] = []
+    for row in rows:
+        batch.append(dumps(to_dict(row)))
+        if len(batch) >= EXPORT_ITERSIZE:
+            body.write('\n'.join(batch) + '\n')
+            batch = []
+    if batch:
+        body.write('\n'.join(batch) + '\n')
+
+
+def write_csv(body: ExportBody, spec: RowSpec, rows: Iterator[tuple]) -> None:
+    lines = [','.join(spec.names)]
+    for row in rows:
+        lines.append(','.join([csv_value(v) for v in row]))
+        if len(lines) >= EXPORT_ITERSIZE:
+            body.write('\n'.join(lines) + '\n')
+            lines = []
+    if lines:
+        body.write('\n'.join(lines) + '\n')
+
+
+def copy_csv(body: ExportBody, conn: Any, spec: RowSpec, from_sql: str, params: Sequence[Any] = ()) -> None:
+    cur = conn.raw.cursor()
+    try:
+        query = cur.mogrify(f'SELECT {spec.select_list} {from_sql}', params).decode()
+        cur.copy_expert(f'COPY ({query}) TO STDOUT WITH (FORMAT csv, HEADER)', body)
+    finally:
+        cur.close()
+
+
+def export_response(
+    event: Dict[str, Any],
+    conn: Any,
+    spec: RowSpec,
+    from_sql: str,
+    filename: str,
+    export_format: str,
+    use_copy: bool = False,
+    params: Sequence[Any] = ()
+) -> Dict[str, Any]:
+    if export_format not in EXPORT_CONTENT_TYPES:
+        raise ExportError('Invalid export format')
+    if use_copy and export_format != 'csv':
+        raise ExportError('COPY export supports csv only')
+
+    compress = accepted_encoding(event, ('gzip',)) is not None
+    body = ExportBody(compress)
+
+    if use_copy:
+        copy_csv(body, conn, spec, from_sql, params)
+    elif export_format == 'csv':
+        write_csv(body, spec, iter_rows(conn, spec, from_sql, params))
+    else:
+        write_ndjson(body, spec, iter_rows(conn, spec, from_sql, params))
+
+    data = body.finish()
+    headers = {
+        'Content-Type': EXPORT_CONTENT_TYPES[export_format],
+        'Content-Disposition': f'attachment; filename="{filename}.{export_format}"',
+        'Access-Control-Allow-Origin': '*',
+        'Access-Control-Expose-Headers': 'Content-Disposition',
+        'Vary': 'Accept-Encoding'
+    }
+
+    if compress:
+        return {
+            'statusCode': 200,
+            'headers': {**headers, 'Content-Encoding': 'gzip'},
+            'body': base64.b64encode(data).decode(),
+            'isBase64Encoded': True
+        }
+
+    return {
+        'statusCode': 200,
+        'headers': headers,
+        'body': data.decode(),
+        'isBase64Encoded': False
+    }
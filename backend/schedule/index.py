@@ -4,11 +4,188 @@ Args: event with httpMethod, body, queryStringParameters
 Returns: HTTP response with matches data or operation result
 '''
 
+import asyncio
 import json
 import os
-import psycopg2
-from psycopg2.extras import RealDictCursor
-from typing import Dict, Any
+import sys
+import threading
+import time
+import psycopg2.errors
+from psycopg2.extras import RealDictCursor, execute_values
+from typing import Dict, Any, List, Tuple
+
+# core/ is vendored into every function by vendor_core.py, so each deploy unit imports its own copy
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.aio import AIO_ENABLED, get_read_pool, get_setting_async, get_settings_async, resolve_admin_async, run_sync
+from core.auth import resolve_admin
+from core.export import export_response, ExportError
+from core.http import respond
+from core.replica import get_routed_connection
+from core.rows import Column, RowSpec, JSON_AGG_LISTS, dumps, fetch_json, text
+from core.settings_cache import get_setting, invalidate_settings
+from core.statements import execute_prepared, register_statement
+
+MATCH_ROW = RowSpec('MatchRow', [
+    Column('id', 'id'),
+    Column('match_date', 'match_date', text),
+    Column('match_time', 'match_time', text),
+    Column('team1_name', 'team1_name'),
+    Column('team2_name', 'team2_name'),
+    Column('status', 'status'),
+    Column('winner_team_id', 'winner_team_id'),
+    Column('score_team1', 'score_team1'),
+    Column('score_team2', 'score_team2'),
+    Column('round', 'round'),
+    Column('stream_url', 'stream_url')
+])
+
+MATCHES_SQL = f"""
+    SELECT {MATCH_ROW.select_list}
+    FROM matches 
+    ORDER BY match_date ASC, match_time ASC
+"""
+
+MATCHES_JSON_SQL = MATCH_ROW.json_agg_sql('FROM matches', 'match_date ASC, match_time ASC')
+
+MATCHES_CURSOR = register_statement(
+    'matches_cursor',
+    """SELECT GREATEST(
+              COALESCE((SELECT MAX(change_seq) FROM matches), 0),
+              COALESCE((SELECT MAX(change_seq) FROM match_deletions), 0),
+              horizon.version
+          ) AS cursor,
+          horizon.version AS horizon
+       FROM (SELECT COALESCE(MAX(version), 0) AS version FROM data_versions
+             WHERE collection = 'match_deletions_horizon') horizon"""
+)
+
+MATCHES_SINCE = register_statement(
+    'matches_since',
+    f"""SELECT {MATCH_ROW.select_list}
+       FROM matches
+       WHERE change_seq > $1
+       ORDER BY match_date ASC, match_time ASC"""
+)
+
+MATCH_DELETIONS_SINCE = register_statement(
+    'match_deletions_since',
+    'SELECT match_id FROM match_deletions WHERE change_seq > $1'
+)
+
+MAX_BULK_MATCHES = int(os.environ.get('MAX_BULK_MATCHES', '500'))
+MATCH_DELETION_RETENTION_DAYS = int(os.environ.get('MATCH_DELETION_RETENTION_DAYS', '30'))
+TOMBSTONE_PRUNE_INTERVAL = float(os.environ.get('TOMBSTONE_PRUNE_INTERVAL', '3600'))
+TOMBSTONE_PRUNE_BATCH = int(os.environ.get('TOMBSTONE_PRUNE_BATCH', '1000'))
+MATCH_REQUIRED_FIELDS = ('match_date', 'match_time', 'team1_name', 'team2_name', 'round')
+
+# Clients whose cursor is older than the horizon get a full resync instead of the pruned deletions
+PRUNE_TOMBSTONES_SQL = """
+    WITH pruned AS (
+        DELETE FROM match_deletions
+        WHERE ctid IN (
+            SELECT ctid FROM match_deletions
+            WHERE deleted_at < NOW() - make_interval(days => %s)
+            LIMIT %s
+        )
+        RETURNING change_seq
+    ), horizon AS (
+        UPDATE data_versions
+        SET version = GREATEST(version, (SELECT MAX(change_seq) FROM pruned)), updated_at = CURRENT_TIMESTAMP
+        WHERE collection = 'match_deletions_horizon' AND EXISTS (SELECT 1 FROM pruned)
+    )
+    SELECT COUNT(*) FROM pruned
+"""
+
+PRUNE_LOCK_SQL = "SELECT pg_try_advisory_lock(hashtext('match_deletions_prune'))"
+PRUNE_UNLOCK_SQL = "SELECT pg_advisory_unlock(hashtext('match_deletions_prune'))"
+
+_next_prune = 0.0
+_prune_lock = threading.Lock()
+
+# Warm name -> id map of schedule_teams across invocations; only ids from committed transactions are kept
+_team_ids: Dict[str, int] = {}
+
+
+def resolve_team_ids(cur: Any, names: List[str]) -> Dict[str, int]:
+    resolved = {name: _team_ids[name] for name in names if name in _team_ids}
+    missing = sorted(set(names) - resolved.keys())
+    
+    if missing:
+        # DO UPDATE instead of DO NOTHING so RETURNING also yields names that already exist
+        cur.execute("""
+            INSERT INTO schedule_teams (name)
+            SELECT unnest(%s::text[])
+            ON CONFLICT (name) DO UPDATE SET name = EXCLUDED.name
+            RETURNING id, name
+        """, (missing,))
+        for row in cur.fetchall():
+            resolved[row['name']] = row['id']
+    
+    return resolved
+
+
+def create_matches(cur: Any, matches: List[Dict[str, Any]]) -> Tuple[List[int], Dict[str, int]]:
+    team_ids = resolve_team_ids(cur, [name for m in matches for name in (m['team1_name'], m['team2_name'])])
+    
+    rows = [(
+        m['match_date'],
+        m['match_time'],
+        team_ids[m['team1_name']],
+        team_ids[m['team2_name']],
+        m['team1_name'],
+        m['team2_name'],
+        m['round'],
+        m.get('status', 'waiting'),
+        m.get('stream_url', '')
+    ) for m in matches]
+    
+    inserted = execute_values(cur, """
+        INSERT INTO matches 
+        (match_date, match_time, team1_id, team2_id, team1_name, team2_name, round, status, stream_url)
+        VALUES %s
+        RETURNING id
+    """, rows, page_size=len(rows), fetch=True)
+    
+    return [row['id'] for row in inserted], team_ids
+
+
+def prune_tombstones(conn: Any) -> int:
+    # Tombstones only appear on deletes, so the delete paths prune them: at most once per TOMBSTONE_PRUNE_INTERVAL
+    # per process, and the advisory lock keeps concurrent containers off the same rows
+    global _next_prune
+
+    with _prune_lock:
+        now = time.monotonic()
+        if now < _next_prune:
+            return 0
+        _next_prune = now + TOMBSTONE_PRUNE_INTERVAL
+
+    pruned = 0
+    try:
+        with conn.raw.cursor() as cur:
+            cur.execute(PRUNE_LOCK_SQL)
+            if not cur.fetchone()[0]:
+                conn.commit()
+                return 0
+
+            try:
+                while True:
+                    cur.execute(PRUNE_TOMBSTONES_SQL, (MATCH_DELETION_RETENTION_DAYS, TOMBSTONE_PRUNE_BATCH))
+                    deleted = cur.fetchone()[0]
+                    conn.commit()
+                    pruned += deleted
+                    if deleted < TOMBSTONE_PRUNE_BATCH:
+                        break
+            finally:
+                conn.rollback()
+                cur.execute(PRUNE_UNLOCK_SQL)
+                conn.commit()
+    except psycopg2.Error:
+        # The delete is already committed; the next delete after the interval retries
+        conn.rollback()
+    return pruned
+
 
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     method: str = event.get('httpMethod', 'GET')
@@ -26,26 +203,23 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'isBase64Encoded': False
         }
     
-    dsn = os.environ.get('DATABASE_URL')
-    if not dsn:
+    if not os.environ.get('DATABASE_URL'):
         return {
             'statusCode': 500,
             'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
             'body': json.dumps({'error': 'Database not configured'})
         }
     
-    conn = psycopg2.connect(dsn)
+    conn = get_routed_connection(event)
     cursor = conn.cursor(cursor_factory=RealDictCursor)
     
     try:
         if method == 'GET':
-            query_params = event.get('queryStringParameters', {})
+            query_params = event.get('queryStringParameters') or {}
             check_published = query_params.get('check_published')
             
             if check_published == 'true':
-                cursor.execute("SELECT value FROM settings WHERE key = 'schedule_published'")
-                setting = cursor.fetchone()
-                published = setting['value'] == 'true' if setting else False
+                published = get_setting(cursor, 'schedule_published') is True
                 
                 return {
                     'statusCode': 200,
@@ -54,18 +228,68 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                     'isBase64Encoded': False
                 }
             
-            cursor.execute("SELECT value FROM settings WHERE key = 'schedule_published'")
-            setting = cursor.fetchone()
-            published = setting['value'] == 'true' if setting else False
+            published = get_setting(cursor, 'schedule_published') is True
             
             headers = event.get('headers', {})
             admin_token = headers.get('X-Admin-Token', headers.get('x-admin-token', ''))
             is_admin = False
             
             if admin_token:
-                cursor.execute("SELECT id, role FROM admin_users WHERE session_token = %s", (admin_token,))
-                admin = cursor.fetchone()
-                is_admin = admin is not None
+                is_admin = resolve_admin(cursor, admin_token) is not None
+            
+            if query_params.get('action') == 'export':
+                if not is_admin:
+                    return {
+                        'statusCode': 403,
+                        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                        'body': json.dumps({'error': 'Invalid token'}),
+                        'isBase64Encoded': False
+                    }
+                
+                try:
+                    return export_response(event, conn, MATCH_ROW, 'FROM matches ORDER BY match_date ASC, match_time ASC', 'matches',
+                                           query_params.get('format', 'ndjson'), query_params.get('copy') == 'true')
+                except ExportError as e:
+                    return {
+                        'statusCode': 400,
+                        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                        'body': json.dumps({'error': str(e)}),
+                        'isBase64Encoded': False
+                    }
+            
+            since = query_params.get('since')
+            if since is not None:
+                try:
+                    since_seq = int(since)
+                except ValueError:
+                    return {
+                        'statusCode': 400,
+                        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                        'body': json.dumps({'error': 'Invalid since cursor'}),
+                        'isBase64Encoded': False
+                    }
+                
+                result = {'published': published, 'cursor': 0, 'full': True, 'matches': [], 'deleted': []}
+                
+                if published or is_admin:
+                    execute_prepared(cursor, MATCHES_CURSOR)
+                    head = cursor.fetchone()
+                    current_seq = head['cursor']
+                    # A cursor behind the pruned tombstones may have missed deletions: send the full schedule
+                    if since_seq > current_seq or since_seq < head['horizon']:
+                        since_seq = 0
+                    
+                    execute_prepared(cursor, MATCHES_SINCE, (since_seq,))
+                    result['matches'] = MATCH_ROW.to_dicts(cursor.fetchall())
+                    
+                    if since_seq > 0:
+                        execute_prepared(cursor, MATCH_DELETIONS_SINCE, (since_seq,))
+                        result['deleted'] = [row['match_id'] for row in cursor.fetchall()]
+                    
+                    result['cursor'] = current_seq
+                    result['full'] = since_seq == 0
+                
+                return respond(event, dumps(result))
             
             if not published and not is_admin:
                 return {
@@ -75,38 +299,14 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                     'isBase64Encoded': False
                 }
             
-            cursor.execute("""
-                SELECT 
-                    id, match_date, match_time, 
-                    team1_id, team2_id, team1_name, team2_name,
-                    status, winner_team_id, score_team1, score_team2, round, stream_url
-                FROM matches 
-                ORDER BY match_date ASC, match_time ASC
-            """)
-            matches = cursor.fetchall()
-            
-            matches_list = []
-            for match in matches:
-                matches_list.append({
-                    'id': match['id'],
-                    'match_date': str(match['match_date']),
-                    'match_time': str(match['match_time']),
-                    'team1_name': match['team1_name'],
-                    'team2_name': match['team2_name'],
-                    'status': match['status'],
-                    'winner_team_id': match['winner_team_id'],
-                    'score_team1': match['score_team1'],
-                    'score_team2': match['score_team2'],
-                    'round': match['round'],
-                    'stream_url': match['stream_url']
-                })
+            if JSON_AGG_LISTS:
+                cursor.execute(MATCHES_JSON_SQL)
+                body = fetch_json(cursor).text
+            else:
+                cursor.execute(MATCHES_SQL)
+                body = dumps(MATCH_ROW.to_dicts(cursor.fetchall()))
             
-            return {
-                'statusCode': 200,
-                'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-                'body': json.dumps(matches_list),
-                'isBase64Encoded': False
-            }
+            return respond(event, body)
         
         elif method == 'POST':
             headers = event.get('headers', {})
@@ -119,8 +319,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                     'body': json.dumps({'error': 'Unauthorized'})
                 }
             
-            cursor.execute("SELECT id, role FROM admin_users WHERE session_token = %s", (admin_token,))
-            admin = cursor.fetchone()
+            admin = resolve_admin(cursor, admin_token)
             
             if not admin:
                 return {
@@ -131,49 +330,50 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             
             body_data = json.loads(event.get('body', '{}'))
             
-            team1_name = body_data['team1_name']
-            team2_name = body_data['team2_name']
-            
-            cursor.execute("SELECT id FROM schedule_teams WHERE name = %s", (team1_name,))
-            team1 = cursor.fetchone()
-            team1_id = team1['id'] if team1 else None
-            
-            if not team1_id:
-                cursor.execute("INSERT INTO schedule_teams (name) VALUES (%s) RETURNING id", (team1_name,))
-                team1_id = cursor.fetchone()['id']
-            
-            cursor.execute("SELECT id FROM schedule_teams WHERE name = %s", (team2_name,))
-            team2 = cursor.fetchone()
-            team2_id = team2['id'] if team2 else None
+            bulk = 'matches' in body_data
+            matches = body_data['matches'] if bulk else [body_data]
             
-            if not team2_id:
-                cursor.execute("INSERT INTO schedule_teams (name) VALUES (%s) RETURNING id", (team2_name,))
-                team2_id = cursor.fetchone()['id']
+            if not isinstance(matches, list) or not matches or len(matches) > MAX_BULK_MATCHES:
+                return {
+                    'statusCode': 400,
+                    'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                    'body': json.dumps({'error': f'matches must be a list of 1 to {MAX_BULK_MATCHES} matches'}),
+                    'isBase64Encoded': False
+                }
             
-            cursor.execute("""
-                INSERT INTO matches 
-                (match_date, match_time, team1_id, team2_id, team1_name, team2_name, round, status, stream_url)
-                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-                RETURNING id
-            """, (
-                body_data['match_date'],
-                body_data['match_time'],
-                team1_id,
-                team2_id,
-                team1_name,
-                team2_name,
-                body_data['round'],
-                body_data.get('status', 'waiting'),
-                body_data.get('stream_url', '')
-            ))
+            for position, match in enumerate(matches):
+                missing = [f for f in MATCH_REQUIRED_FIELDS if not isinstance(match, dict) or not match.get(f)]
+                if missing:
+                    return {
+                        'statusCode': 400,
+                        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                        'body': json.dumps({'error': f"Match {position}: missing {', '.join(missing)}"}),
+                        'isBase64Encoded': False
+                    }
+            
+            try:
+                match_ids, team_ids = create_matches(cursor, matches)
+            except psycopg2.errors.ForeignKeyViolation:
+                # A cached team row was removed outside this function; resolve every name from the table again
+                conn.rollback()
+                _team_ids.clear()
+                match_ids, team_ids = create_matches(cursor, matches)
             
-            match_id = cursor.fetchone()['id']
             conn.commit()
+            _team_ids.update(team_ids)
+            
+            if bulk:
+                return {
+                    'statusCode': 201,
+                    'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                    'body': json.dumps({'ids': match_ids, 'message': 'Matches created'}),
+                    'isBase64Encoded': False
+                }
             
             return {
                 'statusCode': 201,
                 'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-                'body': json.dumps({'id': match_id, 'message': 'Match created'}),
+                'body': json.dumps({'id': match_ids[0], 'message': 'Match created'}),
                 'isBase64Encoded': False
             }
         
@@ -188,8 +388,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                     'body': json.dumps({'error': 'Unauthorized'})
                 }
             
-            cursor.execute("SELECT id, role FROM admin_users WHERE session_token = %s", (admin_token,))
-            admin = cursor.fetchone()
+            admin = resolve_admin(cursor, admin_token)
             
             if not admin:
                 return {
@@ -208,6 +407,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                     WHERE key = 'schedule_published'
                 """, (str(publish).lower(),))
                 conn.commit()
+                invalidate_settings()
                 
                 return {
                     'statusCode': 200,
@@ -251,8 +451,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                     'body': json.dumps({'error': 'Unauthorized'})
                 }
             
-            cursor.execute("SELECT id, role FROM admin_users WHERE session_token = %s", (admin_token,))
-            admin = cursor.fetchone()
+            admin = resolve_admin(cursor, admin_token)
             
             if not admin:
                 return {
@@ -268,6 +467,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             if clear_all == 'true':
                 cursor.execute("DELETE FROM matches")
                 conn.commit()
+                prune_tombstones(conn)
                 return {
                     'statusCode': 200,
                     'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
@@ -284,6 +484,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             
             cursor.execute("DELETE FROM matches WHERE id = %s", (match_id,))
             conn.commit()
+            prune_tombstones(conn)
             
             return {
                 'statusCode': 200,
@@ -300,4 +501,53 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     
     finally:
         cursor.close()
-        conn.close()
\ No newline at end of file
+        conn.close()
+
+
+async def schedule_get_async(event: Dict[str, Any], query_params: Dict[str, Any]) -> Dict[str, Any]:
+    pool = await get_read_pool(event)
+    
+    if query_params.get('check_published') == 'true':
+        published = await get_setting_async(pool, 'schedule_published') is True
+        
+        return {
+            'statusCode': 200,
+            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+            'body': json.dumps({'published': published}),
+            'isBase64Encoded': False
+        }
+    
+    headers = event.get('headers', {})
+    admin_token = headers.get('X-Admin-Token', headers.get('x-admin-token', ''))
+    
+    # The published flag, the admin check and the matches do not depend on each other: one round trip
+    # for all three, at the cost of reading matches that an unpublished schedule then hides
+    matches = pool.fetchval(MATCHES_JSON_SQL) if JSON_AGG_LISTS else pool.fetch(MATCHES_SQL)
+    settings, admin, rows = await asyncio.gather(get_settings_async(pool), resolve_admin_async(pool, admin_token), matches)
+    
+    if settings.get('schedule_published') is not True and admin is None:
+        return {
+            'statusCode': 200,
+            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+            'body': json.dumps([]),
+            'isBase64Encoded': False
+        }
+    
+    body = rows if JSON_AGG_LISTS else dumps(MATCH_ROW.to_dicts(rows))
+    return respond(event, body)
+
+
+async def async_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    '''
+    Business: asyncio variant of handler() on the shared asyncpg pool - the schedule GET runs its queries concurrently;
+              exports, since-cursor reads and writes run handler() on a worker thread
+    Args: event, context - same as handler()
+    Returns: HTTP response dict identical to handler()
+    '''
+    query_params = event.get('queryStringParameters') or {}
+    
+    if (AIO_ENABLED and os.environ.get('DATABASE_URL') and event.get('httpMethod', 'GET') == 'GET'
+            and query_params.get('action') != 'export' and query_params.get('since') is None):
+        return await schedule_get_async(event, query_params)
+    
+    return await run_sync(handler, event, context)
@@ -0,0 +1,85 @@
+'''
+Business: Keyset pagination on (created_at, id) for list endpoints
+Args: opaque cursor strings and limit values from queryStringParameters
+Returns: SQL with bound parameters for one page and the cursor of the next page
+'''
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+MAX_PAGE_SIZE = 200
+
+
+class PageError(ValueError):
+    pass
+
+
+def encode_cursor(created_at: Optional[datetime], row_id: int) -> str:
+    raw = json.dumps([created_at.isoformat() if created_at else None, row_id])
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return (datetime.fromisoformat(created_at) if created_at is not None else None), int(row_id)
+    except (ValueError, TypeError):
+        raise PageError('Invalid cursor')
+
+
+def parse_limit(value: Optional[str]) -> Optional[int]:
+    if value is None or value == '':
+        return None
+
+    try:
+        limit = int(value)
+    except ValueError:
+        raise PageError('Invalid limit')
+
+    if limit < 1:
+        raise PageError('Invalid limit')
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def build_page_query(
+    columns: str,
+    table: str,
+    filters: Sequence[Tuple[str, Any]],
+    cursor: Optional[str],
+    limit: Optional[int]
+) -> Tuple[str, List[Any]]:
+    conditions = [clause for clause, _ in filters]
+    params: List[Any] = [value for _, value in filters]
+
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        if created_at is None:
+            # created_at is nullable and DESC sorts NULLs first: the rest of the NULL rows, then every dated row
+            conditions.append('((created_at IS NULL AND id < %s) OR created_at IS NOT NULL)')
+            params.append(row_id)
+        else:
+            conditions.append('(created_at, id) < (%s, %s)')
+            params.extend((created_at, row_id))
+
+    sql = f'SELECT {columns} FROM {table}'
+    if conditions:
+        sql += ' WHERE ' + ' AND '.join(conditions)
+    sql += ' ORDER BY created_at DESC, id DESC'
+
+    if limit:
+        sql += ' LIMIT %s'
+        params.append(limit + 1)
+
+    return sql, params
+
+
+def split_page(rows: List[Any], limit: Optional[int], created_at_index: int, id_index: int = 0) -> Tuple[List[Any], Optional[str]]:
+    if not limit or len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last[created_at_index], last[id_index])
@@ -1,8 +1,15 @@
 import json
 import os
-import psycopg2
+import sys
 from typing import Dict, Any
 
+# core/ is vendored into every function by vendor_core.py, so each deploy unit imports its own copy
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.http import cached_response, collection_version, make_etag, etag_matches, etag_headers, not_modified, respond
+from core.replica import get_routed_connection
+from core.settings_cache import invalidate_settings
+
 def escape_sql(value: str) -> str:
     return value.replace("'", "''")
 
@@ -21,32 +28,32 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'headers': {
                 'Access-Control-Allow-Origin': '*',
                 'Access-Control-Allow-Methods': 'GET, PUT, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type, X-Admin-Token, X-Auth-Token',
+                'Access-Control-Allow-Headers': 'Content-Type, X-Admin-Token, X-Auth-Token, If-None-Match',
                 'Access-Control-Max-Age': '86400'
             },
             'body': '',
             'isBase64Encoded': False
         }
     
-    conn = psycopg2.connect(os.environ['DATABASE_URL'])
+    conn = get_routed_connection(event)
     cur = conn.cursor()
     
     try:
         if method == 'GET':
+            etag = make_etag('settings', collection_version(cur, 'settings'))
+            if etag_matches(event, etag):
+                return not_modified(etag)
+            
+            cached = cached_response(event, etag)
+            if cached:
+                return cached
+            
             cur.execute("SELECT key, value FROM settings")
             settings = cur.fetchall()
             
             settings_dict = {s[0]: s[1] for s in settings}
             
-            return {
-                'statusCode': 200,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps({'settings': settings_dict}),
-                'isBase64Encoded': False
-            }
+            return respond(event, json.dumps({'settings': settings_dict}), headers=etag_headers(etag), snapshot=etag)
         
         elif method == 'PUT':
             body_data = json.loads(event.get('body', '{}'))
@@ -66,6 +73,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 """
             )
             conn.commit()
+            invalidate_settings()
             
             return {
                 'statusCode': 200,
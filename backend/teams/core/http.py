@@ -0,0 +1,178 @@
+'''
+Business: Shared HTTP helpers for backend handlers - conditional GET with ETags, compressed responses
+Args: event - dict with headers; cur - cursor for the collection version lookup;
+      COMPRESSION_MIN_SIZE, COMPRESSION_CACHE_SIZE env vars
+Returns: ETag strings, ready-made 304 responses and JSON responses gzip/br-encoded per Accept-Encoding
+'''
+
+import base64
+import gzip
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from core.statements import execute_prepared, COLLECTION_VERSION, COLLECTION_VERSIONS
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024'))
+COMPRESSION_CACHE_SIZE = int(os.environ.get('COMPRESSION_CACHE_SIZE', '32'))
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+_compressed: 'OrderedDict[Tuple[Any, ...], Tuple[Dict[str, str], str]]' = OrderedDict()
+_compressed_lock = threading.Lock()
+
+
+def get_header(event: Dict[str, Any], name: str) -> Optional[str]:
+    headers = event.get('headers') or {}
+    return headers.get(name) or headers.get(name.lower())
+
+
+def collection_version(cur: Any, collection: str) -> int:
+    execute_prepared(cur, COLLECTION_VERSION, (collection,))
+    row = cur.fetchone()
+    if not row:
+        return 0
+    return row['version'] if isinstance(row, dict) else row[0]
+
+
+def collection_versions(cur: Any, collections: Sequence[str]) -> Dict[str, int]:
+    execute_prepared(cur, COLLECTION_VERSIONS, (list(collections),))
+    versions = {name: 0 for name in collections}
+    for row in cur.fetchall():
+        if isinstance(row, dict):
+            versions[row['collection']] = row['version']
+        else:
+            versions[row[0]] = row[1]
+    return versions
+
+
+def make_etag(*parts: Any) -> str:
+    return '"' + '-'.join(str(p) for p in parts) + '"'
+
+
+def etag_matches(event: Dict[str, Any], etag: str) -> bool:
+    if_none_match = get_header(event, 'If-None-Match')
+    if not if_none_match:
+        return False
+
+    candidates = [c.strip() for c in if_none_match.split(',')]
+    return '*' in candidates or etag in candidates or f'W/{etag}' in candidates
+
+
+def etag_headers(etag: str) -> Dict[str, str]:
+    return {
+        'ETag': etag,
+        'Cache-Control': 'no-cache',
+        'Access-Control-Expose-Headers': 'ETag'
+    }
+
+
+def not_modified(etag: str) -> Dict[str, Any]:
+    return {
+        'statusCode': 304,
+        'headers': {'Access-Control-Allow-Origin': '*', **etag_headers(etag)},
+        'body': '',
+        'isBase64Encoded': False
+    }
+
+
+def accepted_encoding(event: Dict[str, Any], supported: Sequence[str] = ('br', 'gzip')) -> Optional[str]:
+    accept_encoding = get_header(event, 'Accept-Encoding')
+    if not accept_encoding:
+        return None
+
+    accepted = set()
+    for item in accept_encoding.split(','):
+        coding, _, params = item.partition(';')
+        params = params.strip()
+        try:
+            quality = float(params[2:]) if params.startswith('q=') else 1.0
+        except ValueError:
+            quality = 0.0
+        if quality > 0:
+            accepted.add(coding.strip().lower())
+
+    if 'br' in supported and brotli is not None and ('br' in accepted or '*' in accepted):
+        return 'br'
+    if 'gzip' in supported and ('gzip' in accepted or '*' in accepted):
+        return 'gzip'
+    return None
+
+
+def compress(body: str, encoding: str) -> bytes:
+    data = body.encode()
+    if encoding == 'br':
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def _snapshot_key(event: Dict[str, Any], snapshot: str, encoding: str) -> Tuple[Any, ...]:
+    params = event.get('queryStringParameters') or {}
+    return (snapshot, encoding, tuple(sorted(params.items())))
+
+
+def _encoded_response(status: int, headers: Dict[str, str], encoding: str, body: str) -> Dict[str, Any]:
+    return {
+        'statusCode': status,
+        'headers': {**headers, 'Content-Encoding': encoding},
+        'body': body,
+        'isBase64Encoded': True
+    }
+
+
+def cached_response(event: Dict[str, Any], snapshot: str) -> Optional[Dict[str, Any]]:
+    encoding = accepted_encoding(event)
+    if not encoding:
+        return None
+
+    key = _snapshot_key(event, snapshot, encoding)
+    with _compressed_lock:
+        entry = _compressed.get(key)
+        if entry is None:
+            return None
+        _compressed.move_to_end(key)
+
+    return _encoded_response(200, entry[0], encoding, entry[1])
+
+
+def respond(
+    event: Dict[str, Any],
+    body: str,
+    status: int = 200,
+    headers: Optional[Dict[str, str]] = None,
+    snapshot: Optional[str] = None
+) -> Dict[str, Any]:
+    response_headers = {
+        'Content-Type': 'application/json',
+        'Access-Control-Allow-Origin': '*',
+        'Vary': 'Accept-Encoding',
+        **(headers or {})
+    }
+
+    encoding = accepted_encoding(event) if len(body) >= COMPRESSION_MIN_SIZE else None
+    if not encoding:
+        return {
+            'statusCode': status,
+            'headers': response_headers,
+            'body': body,
+            'isBase64Encoded': False
+        }
+
+    encoded = base64.b64encode(compress(body, encoding)).decode()
+
+    # A snapshot names a versioned body (its ETag), so one version is never compressed twice
+    if snapshot and status == 200:
+        key = _snapshot_key(event, snapshot, encoding)
+        with _compressed_lock:
+            _compressed[key] = (response_headers, encoded)
+            _compressed.move_to_end(key)
+            while len(_compressed) > COMPRESSION_CACHE_SIZE:
+                _compressed.popitem(last=False)
+
+    return _encoded_response(status, response_headers, encoding, encoded)
@@ -0,0 +1,163 @@
+'''
+Business: Route GET reads to a read replica, keeping admins who just wrote on the primary and falling back when the replica lags or is down
+Args: DATABASE_READ_URL env var (routing is off while unset); REPLICA_MAX_LAG, REPLICA_CHECK_INTERVAL, REPLICA_RETRY_INTERVAL,
+      READ_YOUR_WRITES_WINDOW, REPLICA_CONNECT_TIMEOUT env vars (seconds), REPLICA_STATEMENT_TIMEOUT (ms);
+      event - request with httpMethod and session token headers
+Returns: get_routed_connection() PooledConnection on the replica or the primary; read_dsn() DSN for a read
+
+Read-your-writes pins live in the memory of one process. A GET served by another container, or by another
+worker of serve.py, right after a write may still read the replica; only REPLICA_MAX_LAG bounds what it misses.
+'''
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import psycopg2
+
+from core.auth import cached_admin
+from core.db import PooledConnection, get_connection
+from core.http import get_header
+
+DATABASE_READ_URL = os.environ.get('DATABASE_READ_URL', '')
+REPLICA_MAX_LAG = float(os.environ.get('REPLICA_MAX_LAG', '5'))
+REPLICA_CHECK_INTERVAL = float(os.environ.get('REPLICA_CHECK_INTERVAL', '10'))
+REPLICA_RETRY_INTERVAL = float(os.environ.get('REPLICA_RETRY_INTERVAL', '30'))
+READ_YOUR_WRITES_WINDOW = float(os.environ.get('READ_YOUR_WRITES_WINDOW', '15'))
+REPLICA_CONNECT_TIMEOUT = int(os.environ.get('REPLICA_CONNECT_TIMEOUT', '2'))
+REPLICA_STATEMENT_TIMEOUT = int(os.environ.get('REPLICA_STATEMENT_TIMEOUT', '1000'))
+PIN_CACHE_SIZE = 1024
+
+TOKEN_HEADERS = ('X-Auth-Token', 'X-Admin-Token', 'X-Session-Token')
+
+# A streaming replica that has replayed all the WAL it received reports no lag, so a quiet primary does not
+# read as lag. Without a streaming WAL receiver (disconnected, or status hidden from a role lacking
+# pg_read_all_stats) equal LSNs prove nothing: the age of the last replayed transaction counts, and NULL
+# when nothing was replayed yet marks the replica down
+REPLICA_LAG_SQL = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn()
+             AND EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') THEN 0
+        ELSE EXTRACT(EPOCH FROM NOW() - pg_last_xact_replay_timestamp())
+    END
+"""
+
+# (next check at, replica usable)
+_health: Tuple[float, bool] = (0.0, False)
+_pins: 'OrderedDict[str, float]' = OrderedDict()
+_lock = threading.Lock()
+
+
+def request_token(event: Dict[str, Any]) -> Optional[str]:
+    for name in TOKEN_HEADERS:
+        token = get_header(event, name)
+        if token:
+            return token
+    return None
+
+
+def pin_to_primary(token: Optional[str]) -> None:
+    if not token or not DATABASE_READ_URL:
+        return
+
+    with _lock:
+        _pins[token] = time.monotonic() + READ_YOUR_WRITES_WINDOW
+        _pins.move_to_end(token)
+        while len(_pins) > PIN_CACHE_SIZE:
+            _pins.popitem(last=False)
+
+
+def is_pinned(token: str) -> bool:
+    with _lock:
+        expires_at = _pins.get(token)
+        if expires_at is None:
+            return False
+        if expires_at > time.monotonic():
+            return True
+        del _pins[token]
+        return False
+
+
+def mark_replica_down() -> None:
+    global _health
+    with _lock:
+        _health = (time.monotonic() + REPLICA_RETRY_INTERVAL, False)
+
+
+def replica_lag() -> Optional[float]:
+    # The probe runs inside a request, so it gets its own short-lived connection with tight timeouts
+    # instead of a pooled one that could hang on an unreachable or stuck replica
+    try:
+        conn = psycopg2.connect(
+            DATABASE_READ_URL,
+            connect_timeout=REPLICA_CONNECT_TIMEOUT,
+            options=f'-c statement_timeout={REPLICA_STATEMENT_TIMEOUT}'
+        )
+    except psycopg2.Error:
+        return None
+
+    try:
+        with conn.cursor() as cur:
+            cur.execute(REPLICA_LAG_SQL)
+            lag = cur.fetchone()[0]
+            return float(lag) if lag is not None else None
+    except psycopg2.Error:
+        return None
+    finally:
+        conn.close()
+
+
+def replica_usable() -> bool:
+    global _health
+
+    now = time.monotonic()
+    with _lock:
+        next_check, usable = _health
+        if now < next_check:
+            return usable
+        # Claim the check so concurrent requests keep the last verdict instead of probing too
+        _health = (now + REPLICA_CHECK_INTERVAL, usable)
+
+    lag = replica_lag()
+    if lag is None:
+        mark_replica_down()
+        return False
+
+    usable = lag <= REPLICA_MAX_LAG
+    with _lock:
+        _health = (time.monotonic() + REPLICA_CHECK_INTERVAL, usable)
+    return usable
+
+
+def read_dsn(token: Optional[str] = None) -> str:
+    primary = os.environ['DATABASE_URL']
+    if not DATABASE_READ_URL:
+        return primary
+
+    # A token this process has not resolved yet may be a login the replica has not replayed;
+    # the primary resolves it once and the admin cache serves the replica reads after that
+    if token and (is_pinned(token) or cached_admin(token) is None):
+        return primary
+
+    return DATABASE_READ_URL if replica_usable() else primary
+
+
+def primary_fallback() -> str:
+    mark_replica_down()
+    return os.environ['DATABASE_URL']
+
+
+def get_routed_connection(event: Dict[str, Any], cursor_factory: Any = None) -> PooledConnection:
+    token = request_token(event)
+
+    if event.get('httpMethod', 'GET') != 'GET':
+        pin_to_primary(token)
+        return get_connection(cursor_factory)
+
+    dsn = read_dsn(token)
+    if dsn == DATABASE_READ_URL:
+        return PooledConnection(dsn, cursor_factory, fallback=primary_fallback)
+    return get_connection(cursor_factory, dsn)
@@ -0,0 +1,136 @@
+'''
+Business: Stateless HMAC-signed user session tokens that verify without a database round trip
+Args: SESSION_SECRET env var (signing is off while unset); SESSION_TTL, REVOCATION_CACHE_TTL env vars (seconds);
+      cur - any cursor of a pooled connection
+Returns: issue_session_token() token string; resolve_user_session() UserSession or None; revoke_session_token() on logout
+'''
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+from datetime import datetime
+from typing import Any, NamedTuple, Optional, Set, Tuple
+
+from core.statements import execute_prepared, register_statement, USER_SESSION_BY_TOKEN
+
+SESSION_SECRET = os.environ.get('SESSION_SECRET', '')
+SIGNED_SESSIONS = bool(SESSION_SECRET)
+SESSION_TTL = int(os.environ.get('SESSION_TTL', str(7 * 24 * 3600)))
+REVOCATION_CACHE_TTL = float(os.environ.get('REVOCATION_CACHE_TTL', '30'))
+
+TOKEN_PREFIX = 'v1.'
+
+ACTIVE_REVOCATIONS = register_statement(
+    'active_revocations',
+    'SELECT jti FROM revoked_sessions WHERE expires_at > NOW()'
+)
+
+
+class UserSession(NamedTuple):
+    telegram: str
+    user_type: str
+    expires_at: datetime
+    jti: Optional[str] = None
+
+
+_revoked: Tuple[float, Set[str]] = (0.0, set())
+_lock = threading.Lock()
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode()
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+
+
+def _sign(message: str) -> str:
+    return _b64encode(hmac.new(SESSION_SECRET.encode(), message.encode(), hashlib.sha256).digest())
+
+
+def issue_session_token(telegram: str, user_type: str) -> str:
+    payload = {'sub': telegram, 'typ': user_type, 'exp': int(time.time()) + SESSION_TTL, 'jti': secrets.token_urlsafe(12)}
+    message = TOKEN_PREFIX + _b64encode(json.dumps(payload, separators=(',', ':')).encode())
+    return f'{message}.{_sign(message)}'
+
+
+def decode_session_token(token: str) -> Optional[UserSession]:
+    # Signature and expiry only; revocation is checked by resolve_user_session
+    if not SIGNED_SESSIONS or not token.startswith(TOKEN_PREFIX):
+        return None
+
+    message, _, signature = token.rpartition('.')
+    # Bytes, because compare_digest raises on non-ASCII str and a crafted token must only fail to verify
+    if not message or not hmac.compare_digest(signature.encode(), _sign(message).encode()):
+        return None
+
+    try:
+        payload = json.loads(_b64decode(message[len(TOKEN_PREFIX):]))
+        if payload['exp'] < time.time():
+            return None
+        return UserSession(payload['sub'], payload['typ'], datetime.fromtimestamp(payload['exp']), payload['jti'])
+    except (ValueError, KeyError, TypeError):
+        return None
+
+
+def revoked_ids(cur: Any) -> Set[str]:
+    global _revoked
+
+    loaded_at, revoked = _revoked
+    if time.monotonic() - loaded_at < REVOCATION_CACHE_TTL:
+        return revoked
+
+    with cur.connection.cursor() as plain_cur:
+        execute_prepared(plain_cur, ACTIVE_REVOCATIONS)
+        revoked = {row[0] for row in plain_cur.fetchall()}
+
+    with _lock:
+        _revoked = (time.monotonic(), revoked)
+    return revoked
+
+
+def resolve_user_session(cur: Any, token: Optional[str]) -> Optional[UserSession]:
+    '''Returns the session for a live token; unknown, revoked and expired tokens all resolve to None.'''
+    if not token:
+        return None
+
+    if token.startswith(TOKEN_PREFIX):
+        session = decode_session_token(token)
+        if session is None or session.jti in revoked_ids(cur):
+            return None
+        return session
+
+    # Opaque tokens issued before SESSION_SECRET was set live in user_sessions until they expire
+    execute_prepared(cur, USER_SESSION_BY_TOKEN, (token,))
+    row = cur.fetchone()
+    if not row:
+        return None
+    if isinstance(row, dict):
+        session = UserSession(row['telegram'], row['user_type'], row['expires_at'])
+    else:
+        session = UserSession(row[0], row[1], row[2])
+    # Expired rows stay until the sweep deletes them
+    return session if datetime.now() <= session.expires_at else None
+
+
+def revoke_session_token(cur: Any, token: str) -> bool:
+    # An expired token is already rejected everywhere, so it is not written to revoked_sessions
+    session = decode_session_token(token)
+    if session is None:
+        return False
+
+    cur.execute(
+        """INSERT INTO revoked_sessions (jti, expires_at) VALUES (%s, %s)
+           ON CONFLICT (jti) DO NOTHING""",
+        (session.jti, session.expires_at)
+    )
+    # Visible in this process at once; other instances pick it up within REVOCATION_CACHE_TTL
+    with _lock:
+        _revoked[1].add(session.jti)
+    return True
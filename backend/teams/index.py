@@ -1,8 +1,25 @@
+import asyncio
 import json
 import os
+import sys
 import hashlib
-import psycopg2
-from typing import Dict, Any
+import secrets
+from typing import Dict, Any, List
+
+# core/ is vendored into every function by vendor_core.py, so each deploy unit imports its own copy
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.aio import AIO_ENABLED, fetch_prepared, fetchrow_prepared, fetchval_prepared, get_pool, get_read_pool, run_sync
+from core.auth import resolve_admin
+from core.export import export_response, ExportError
+from core.importer import ImportField, UploadError, copy_to_staging, merge_staging, parse_upload, validate_rows
+from core.http import cached_response, collection_version, collection_versions, make_etag, etag_matches, etag_headers, not_modified, respond
+from core.pagination import build_page_query, parse_limit, split_page, PageError
+from core.replica import get_routed_connection
+from core.rows import Column, RawJson, RowSpec, JSON_AGG_LISTS, array, dumps, fetch_json, flag, iso, join_json
+from core.settings_cache import get_setting, ALL_SETTINGS
+from core.statements import execute_prepared, register_statement, COLLECTION_VERSIONS
+from core.tokens import SIGNED_SESSIONS, TOKEN_PREFIX, issue_session_token, resolve_user_session
 
 def escape_sql(value: str) -> str:
     return value.replace("'", "''")
@@ -10,6 +27,307 @@ def escape_sql(value: str) -> str:
 def hash_password(password: str) -> str:
     return hashlib.sha256(password.encode()).hexdigest()
 
+TEAM_ROW = RowSpec('TeamRow', [
+    Column('id', 'id'),
+    Column('team_name', 'teamName'),
+    Column('captain_nick', 'captainNick'),
+    Column('captain_telegram', 'captainTelegram'),
+    Column('status', 'status'),
+    Column('created_at', 'createdAt', iso),
+    Column('top_nick', 'topNick'),
+    Column('top_telegram', 'topTelegram'),
+    Column('jungle_nick', 'jungleNick'),
+    Column('jungle_telegram', 'jungleTelegram'),
+    Column('mid_nick', 'midNick'),
+    Column('mid_telegram', 'midTelegram'),
+    Column('adc_nick', 'adcNick'),
+    Column('adc_telegram', 'adcTelegram'),
+    Column('support_nick', 'supportNick'),
+    Column('support_telegram', 'supportTelegram'),
+    Column('sub1_nick', 'sub1Nick'),
+    Column('sub1_telegram', 'sub1Telegram'),
+    Column('sub2_nick', 'sub2Nick'),
+    Column('sub2_telegram', 'sub2Telegram'),
+    Column('is_edited', 'isEdited', flag),
+    Column('updated_at', 'updatedAt', iso)
+])
+
+TEAM_LOGIN_ROW = TEAM_ROW.without('created_at', 'is_edited', 'updated_at')
+TEAM_SNAPSHOT_ROW = TEAM_ROW.without('id', 'status', 'created_at', 'is_edited', 'updated_at')
+
+TEAM_REVISION_ROW = RowSpec('TeamRevisionRow', [
+    Column('id', 'id'),
+    Column('changes', 'changes'),
+    Column('edited_by', 'editedBy'),
+    Column('created_at', 'createdAt', iso)
+])
+
+PLAYER_ROW = RowSpec('PlayerRow', [
+    Column('id', 'id'),
+    Column('nickname', 'nickname'),
+    Column('telegram', 'telegram'),
+    Column('preferred_roles', 'preferredRoles', array),
+    Column('status', 'status'),
+    Column('created_at', 'createdAt', iso),
+    Column('has_friends', 'hasFriends', flag),
+    Column('friend1_nickname', 'friend1Nickname'),
+    Column('friend1_telegram', 'friend1Telegram'),
+    Column('friend1_roles', 'friend1Roles', array),
+    Column('friend2_nickname', 'friend2Nickname'),
+    Column('friend2_telegram', 'friend2Telegram'),
+    Column('friend2_roles', 'friend2Roles', array)
+])
+
+APPLICATION_STATUSES = ('pending', 'approved', 'rejected')
+
+TEAM_IMPORT_FIELDS = [
+    ImportField('team_name', 'teamName', required=True, unique=True),
+    ImportField('captain_nick', 'captainNick', required=True),
+    ImportField('captain_telegram', 'captainTelegram', required=True),
+    ImportField('top_nick', 'topNick', required=True),
+    ImportField('top_telegram', 'topTelegram', required=True),
+    ImportField('jungle_nick', 'jungleNick', required=True),
+    ImportField('jungle_telegram', 'jungleTelegram', required=True),
+    ImportField('mid_nick', 'midNick', required=True),
+    ImportField('mid_telegram', 'midTelegram', required=True),
+    ImportField('adc_nick', 'adcNick', required=True),
+    ImportField('adc_telegram', 'adcTelegram', required=True),
+    ImportField('support_nick', 'supportNick', required=True),
+    ImportField('support_telegram', 'supportTelegram', required=True),
+    ImportField('sub1_nick', 'sub1Nick'),
+    ImportField('sub1_telegram', 'sub1Telegram'),
+    ImportField('sub2_nick', 'sub2Nick'),
+    ImportField('sub2_telegram', 'sub2Telegram'),
+    ImportField('status', 'status', default='pending', choices=APPLICATION_STATUSES),
+    ImportField('password_hash', 'password', transform=hash_password)
+]
+
+PLAYER_IMPORT_FIELDS = [
+    ImportField('nickname', 'nickname', required=True),
+    ImportField('telegram', 'telegram', required=True, unique=True),
+    ImportField('preferred_roles', 'preferredRoles', kind='array'),
+    ImportField('status', 'status', default='pending', choices=APPLICATION_STATUSES),
+    ImportField('has_friends', 'hasFriends', kind='bool', default=False),
+    ImportField('friend1_nickname', 'friend1Nickname'),
+    ImportField('friend1_telegram', 'friend1Telegram'),
+    ImportField('friend1_roles', 'friend1Roles', kind='array'),
+    ImportField('friend2_nickname', 'friend2Nickname'),
+    ImportField('friend2_telegram', 'friend2Telegram'),
+    ImportField('friend2_roles', 'friend2Roles', kind='array')
+]
+
+TEAM_IMPORT_COLUMNS = ', '.join(f.column for f in TEAM_IMPORT_FIELDS)
+PLAYER_IMPORT_COLUMNS = ', '.join(f.column for f in PLAYER_IMPORT_FIELDS)
+
+# Team names are not unique in the schema, so existing names are skipped explicitly. The lock makes
+# registrations committed meanwhile wait (or be visible to the merge) instead of slipping past NOT EXISTS;
+# it conflicts with itself, so concurrent imports run one after the other
+TEAM_IMPORT_LOCK = 'LOCK TABLE teams IN SHARE ROW EXCLUSIVE MODE'
+
+TEAM_IMPORT_MERGE = f"""INSERT INTO teams ({TEAM_IMPORT_COLUMNS})
+       SELECT {TEAM_IMPORT_COLUMNS} FROM import_teams s
+       WHERE NOT EXISTS (SELECT 1 FROM teams t WHERE t.team_name = s.team_name)
+       ORDER BY s.line
+       RETURNING id, team_name"""
+
+PLAYER_IMPORT_MERGE = f"""INSERT INTO individual_players ({PLAYER_IMPORT_COLUMNS})
+       SELECT {PLAYER_IMPORT_COLUMNS} FROM import_individual_players
+       ORDER BY line
+       ON CONFLICT (telegram) DO NOTHING
+       RETURNING id, telegram"""
+
+MAX_BATCH_ITEMS = 1000
+
+BATCH_TABLES = {'team': 'teams', 'player': 'individual_players'}
+
+TEAMS_BY_STATUS = register_statement(
+    'teams_by_status',
+    f"""SELECT {TEAM_ROW.select_list}
+       FROM teams WHERE status = ANY($1) ORDER BY created_at DESC, id DESC"""
+)
+
+TEAM_BY_ID = register_statement(
+    'team_by_id',
+    f'SELECT {TEAM_ROW.select_list} FROM teams WHERE id = $1'
+)
+
+PLAYERS_LIST = register_statement(
+    'players_list',
+    f"""SELECT {PLAYER_ROW.select_list}
+       FROM individual_players
+       ORDER BY created_at DESC, id DESC"""
+)
+
+TEAMS_BY_STATUS_JSON = register_statement(
+    'teams_by_status_json',
+    TEAM_ROW.json_agg_sql('FROM teams WHERE status = ANY($1)', 'created_at DESC, id DESC')
+)
+
+PLAYERS_LIST_JSON = register_statement(
+    'players_list_json',
+    PLAYER_ROW.json_agg_sql('FROM individual_players', 'created_at DESC, id DESC')
+)
+
+# Bootstrap sections in one round trip for the json_agg mode; CASE skips the subqueries of fresh sections
+BOOTSTRAP_SECTIONS_JSON = register_statement(
+    'bootstrap_sections_json',
+    f"""SELECT CASE WHEN $1 THEN ({TEAM_ROW.json_agg_sql("FROM teams WHERE status = 'approved'", 'created_at DESC, id DESC')}) END,
+              CASE WHEN $1 THEN ({TEAM_ROW.json_agg_sql("FROM teams WHERE status = 'pending'", 'created_at DESC, id DESC')}) END,
+              CASE WHEN $2 THEN ({PLAYER_ROW.json_agg_sql('FROM individual_players', 'created_at DESC, id DESC')}) END,
+              CASE WHEN $3 THEN (SELECT COALESCE(json_agg(json_build_array(key, value)), '[]')::text FROM settings) END"""
+)
+
+TEAM_HISTORY_LIMIT = 20
+
+TEAM_SNAPSHOT_SQL = f'{TEAM_SNAPSHOT_ROW.json_object_sql()}::jsonb'
+
+# Appends {"field": [old, new]} for every changed field; the CTEs before/updated hold the two snapshots
+TEAM_REVISION_INSERT = """INSERT INTO team_revisions (team_id, changes, edited_by)
+           SELECT updated.id, diff.changes, '{edited_by}'
+           FROM updated
+           JOIN before ON before.id = updated.id
+           CROSS JOIN LATERAL (
+               SELECT jsonb_object_agg(o.key, jsonb_build_array(o.value, n.value)) AS changes
+               FROM jsonb_each(before.snapshot) o
+               JOIN jsonb_each(updated.snapshot) n USING (key)
+               WHERE o.value IS DISTINCT FROM n.value
+           ) diff
+           WHERE diff.changes IS NOT NULL"""
+
+
+def team_edit_set(first_param: int) -> str:
+    return ', '.join(f'{c.name} = ${i}' for i, c in enumerate(TEAM_SNAPSHOT_ROW.columns, first_param))
+
+
+# Captain edit in one round trip: ownership (signed-token telegram in $2, or an opaque session token in $3),
+# the registration flag, the update and its revision row. Every CTE sees the pre-update table,
+# so before holds the previous values.
+CAPTAIN_TEAM_UPDATE = register_statement(
+    'captain_team_update',
+    f"""WITH owner AS (
+           SELECT id AS team_id FROM teams
+           WHERE id = $1 AND captain_telegram = COALESCE($2, (
+               SELECT telegram FROM user_sessions
+               WHERE session_token = $3 AND user_type = 'team_captain' AND expires_at >= NOW()
+           ))
+       ),
+       flag AS (
+           SELECT COALESCE((SELECT value <> 'false' FROM settings WHERE key = 'registration_open'), true) AS registration_open
+       ),
+       before AS (
+           SELECT id, {TEAM_SNAPSHOT_SQL} AS snapshot FROM teams WHERE id = $1
+       ),
+       updated AS (
+           UPDATE teams
+           SET {team_edit_set(4)}, status = 'pending', is_edited = true, updated_at = CURRENT_TIMESTAMP
+           FROM owner, flag
+           WHERE teams.id = owner.team_id AND flag.registration_open
+           RETURNING teams.id, {TEAM_SNAPSHOT_SQL} AS snapshot
+       ),
+       revision AS (
+           {TEAM_REVISION_INSERT.format(edited_by='captain')}
+       )
+       SELECT EXISTS (SELECT 1 FROM owner) AS owned, flag.registration_open, EXISTS (SELECT 1 FROM updated) AS updated
+       FROM flag"""
+)
+
+ADMIN_TEAM_UPDATE = register_statement(
+    'admin_team_update',
+    f"""WITH before AS (
+           SELECT id, {TEAM_SNAPSHOT_SQL} AS snapshot FROM teams WHERE id = $1
+       ),
+       updated AS (
+           UPDATE teams SET {team_edit_set(2)}, updated_at = CURRENT_TIMESTAMP
+           WHERE id = $1
+           RETURNING id, {TEAM_SNAPSHOT_SQL} AS snapshot
+       ),
+       revision AS (
+           {TEAM_REVISION_INSERT.format(edited_by='admin')}
+       )
+       SELECT EXISTS (SELECT 1 FROM updated) AS updated"""
+)
+
+TEAM_REVISIONS = register_statement(
+    'team_revisions',
+    f"""SELECT {TEAM_REVISION_ROW.select_list}
+       FROM team_revisions WHERE team_id = $1 AND ($3::text IS NULL OR edited_by = $3)
+       ORDER BY id DESC LIMIT $2"""
+)
+
+TEAM_LOGIN = register_statement(
+    'team_login',
+    f"""SELECT {TEAM_LOGIN_ROW.select_list}
+       FROM teams WHERE team_name = $1 AND password_hash = $2
+       LIMIT 1"""
+)
+
+# Opaque sessions: the lookup and the session row in one round trip, no team means no session
+TEAM_LOGIN_WITH_SESSION = register_statement(
+    'team_login_with_session',
+    f"""WITH team AS (
+           SELECT {TEAM_LOGIN_ROW.select_list}
+           FROM teams WHERE team_name = $1 AND password_hash = $2
+           LIMIT 1
+       ),
+       session AS (
+           INSERT INTO user_sessions (telegram, user_type, session_token, expires_at)
+           SELECT captain_telegram, 'team_captain', $3, NOW() + INTERVAL '7 days' FROM team
+       )
+       SELECT {TEAM_LOGIN_ROW.select_list} FROM team"""
+)
+
+def apply_batch(cur: Any, items: List[Any]) -> List[Dict[str, Any]]:
+    results: List[Dict[str, Any]] = []
+    pending: List[tuple] = []
+    groups: Dict[tuple, List[int]] = {}
+    
+    for item in items:
+        if not isinstance(item, dict):
+            results.append({'success': False, 'error': 'Invalid item'})
+            continue
+        
+        item_type, op, status = item.get('type'), item.get('op'), item.get('status')
+        result = {'id': item.get('id'), 'type': item_type, 'op': op}
+        results.append(result)
+        
+        try:
+            item_id = int(item.get('id'))
+        except (TypeError, ValueError):
+            result.update(success=False, error='Invalid id')
+            continue
+        
+        if item_type not in BATCH_TABLES:
+            result.update(success=False, error='Invalid type')
+        elif op not in ('status', 'delete'):
+            result.update(success=False, error='Invalid op')
+        elif op == 'status' and status not in APPLICATION_STATUSES:
+            result.update(success=False, error='Invalid status')
+        else:
+            key = (op == 'delete', item_type, status if op == 'status' else '')
+            groups.setdefault(key, []).append(item_id)
+            pending.append((result, key, item_id))
+    
+    # One statement per (op, type, status) group; status changes sort before deletes
+    affected: Dict[tuple, set] = {}
+    for key in sorted(groups):
+        is_delete, item_type, status = key
+        table = BATCH_TABLES[item_type]
+        if is_delete:
+            cur.execute(f"DELETE FROM {table} WHERE id = ANY(%s) RETURNING id", (groups[key],))
+        elif item_type == 'team' and status == 'approved':
+            cur.execute("UPDATE teams SET status = %s, is_edited = false WHERE id = ANY(%s) RETURNING id", (status, groups[key]))
+        else:
+            cur.execute(f"UPDATE {table} SET status = %s WHERE id = ANY(%s) RETURNING id", (status, groups[key]))
+        affected[key] = {row[0] for row in cur.fetchall()}
+    
+    for result, key, item_id in pending:
+        if item_id in affected[key]:
+            result['success'] = True
+        else:
+            result.update(success=False, error='Not found')
+    
+    return results
+
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     '''
     Business: Manage team registrations - create, list, approve, reject
@@ -25,14 +343,14 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             'headers': {
                 'Access-Control-Allow-Origin': '*',
                 'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS',
-                'Access-Control-Allow-Headers': 'Content-Type, X-Auth-Token, X-Session-Token',
+                'Access-Control-Allow-Headers': 'Content-Type, X-Auth-Token, X-Session-Token, If-None-Match',
                 'Access-Control-Max-Age': '86400'
             },
             'body': '',
             'isBase64Encoded': False
         }
     
-    conn = psycopg2.connect(os.environ['DATABASE_URL'])
+    conn = get_routed_connection(event)
     cur = conn.cursor()
     
     try:
@@ -47,49 +365,160 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                     'isBase64Encoded': False
                 }
             
-            if params.get('type') == 'individual':
-                cur.execute(
-                    """SELECT id, nickname, telegram, preferred_roles, status, created_at,
-                              has_friends, friend1_nickname, friend1_telegram, friend1_roles,
-                              friend2_nickname, friend2_telegram, friend2_roles
-                       FROM individual_players 
-                       ORDER BY created_at DESC"""
-                )
-                players = cur.fetchall()
-                
-                players_list = [{
-                    'id': p[0],
-                    'nickname': p[1],
-                    'telegram': p[2],
-                    'preferredRoles': p[3] if p[3] else [],
-                    'status': p[4],
-                    'createdAt': p[5].isoformat() if p[5] else None,
-                    'hasFriends': p[6] if p[6] is not None else False,
-                    'friend1Nickname': p[7],
-                    'friend1Telegram': p[8],
-                    'friend1Roles': p[9] if p[9] else [],
-                    'friend2Nickname': p[10],
-                    'friend2Telegram': p[11],
-                    'friend2Roles': p[12] if p[12] else []
-                } for p in players]
+            if params.get('action') == 'export':
+                auth_token = event.get('headers', {}).get('X-Auth-Token') or event.get('headers', {}).get('x-auth-token')
                 
-                return {
-                    'statusCode': 200,
-                    'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-                    'body': json.dumps({'players': players_list}),
-                    'isBase64Encoded': False
+                if not resolve_admin(cur, auth_token):
+                    return {
+                        'statusCode': 403,
+                        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                        'body': json.dumps({'error': 'Требуется админ доступ'}),
+                        'isBase64Encoded': False
+                    }
+                
+                if params.get('type') == 'individual':
+                    spec, from_sql, filename = PLAYER_ROW, 'FROM individual_players ORDER BY created_at DESC, id DESC', 'players'
+                else:
+                    spec, from_sql, filename = TEAM_ROW, 'FROM teams ORDER BY created_at DESC, id DESC', 'teams'
+                
+                try:
+                    return export_response(event, conn, spec, from_sql, filename,
+                                           params.get('format', 'ndjson'), params.get('copy') == 'true')
+                except ExportError as e:
+                    return {
+                        'statusCode': 400,
+                        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                        'body': json.dumps({'error': str(e)}),
+                        'isBase64Encoded': False
+                    }
+            
+            if params.get('action') == 'history':
+                auth_token = event.get('headers', {}).get('X-Auth-Token') or event.get('headers', {}).get('x-auth-token')
+                
+                if not resolve_admin(cur, auth_token):
+                    return {
+                        'statusCode': 403,
+                        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                        'body': json.dumps({'error': 'Требуется админ доступ'}),
+                        'isBase64Encoded': False
+                    }
+                
+                edited_by = params.get('editedBy') or None
+                try:
+                    team_id = int(params.get('teamId', ''))
+                    limit = parse_limit(params.get('limit')) or TEAM_HISTORY_LIMIT
+                    if edited_by not in (None, 'captain', 'admin'):
+                        raise ValueError(edited_by)
+                except (ValueError, PageError):
+                    return {
+                        'statusCode': 400,
+                        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                        'body': json.dumps({'error': 'Invalid teamId, limit or editedBy'}),
+                        'isBase64Encoded': False
+                    }
+                
+                execute_prepared(cur, TEAM_REVISIONS, (team_id, limit, edited_by))
+                return respond(event, dumps({'teamId': team_id, 'revisions': TEAM_REVISION_ROW.to_dicts(cur.fetchall())}))
+            
+            if params.get('action') == 'bootstrap':
+                versions = collection_versions(cur, ('teams', 'individual_players', 'settings'))
+                section_versions = {
+                    'teams': versions['teams'],
+                    'players': versions['individual_players'],
+                    'settings': versions['settings']
                 }
+                
+                etag = make_etag('bootstrap', section_versions['teams'], section_versions['players'], section_versions['settings'])
+                if etag_matches(event, etag):
+                    return not_modified(etag)
+                
+                cached = cached_response(event, etag)
+                if cached:
+                    return cached
+                
+                result: Dict[str, Any] = {'versions': section_versions}
+                teams_stale = params.get('teamsVersion') != str(section_versions['teams'])
+                players_stale = params.get('playersVersion') != str(section_versions['players'])
+                settings_stale = params.get('settingsVersion') != str(section_versions['settings'])
+                
+                if JSON_AGG_LISTS:
+                    execute_prepared(cur, BOOTSTRAP_SECTIONS_JSON, (teams_stale, players_stale, settings_stale))
+                    approved_teams, pending_teams, players, settings = cur.fetchone()
+                    if teams_stale:
+                        result['approvedTeams'] = RawJson(approved_teams)
+                        result['pendingTeams'] = RawJson(pending_teams)
+                    if players_stale:
+                        result['players'] = RawJson(players)
+                    if settings_stale:
+                        result['settings'] = dict(json.loads(settings))
+                    return respond(event, join_json(result), headers=etag_headers(etag), snapshot=etag)
+                
+                # The Python mapper needs typed rows per section and psycopg2 only returns the last result set
+                # of a batch, so this mode reads each stale section in turn (async_handler gathers them)
+                if teams_stale:
+                    execute_prepared(cur, TEAMS_BY_STATUS, (['approved', 'pending'],))
+                    teams_list = TEAM_ROW.to_dicts(cur.fetchall())
+                    result['approvedTeams'] = [t for t in teams_list if t['status'] == 'approved']
+                    result['pendingTeams'] = [t for t in teams_list if t['status'] == 'pending']
+                
+                if players_stale:
+                    execute_prepared(cur, PLAYERS_LIST)
+                    result['players'] = PLAYER_ROW.to_dicts(cur.fetchall())
+                
+                if settings_stale:
+                    execute_prepared(cur, ALL_SETTINGS)
+                    result['settings'] = {s[0]: s[1] for s in cur.fetchall()}
+                
+                return respond(event, join_json(result), headers=etag_headers(etag), snapshot=etag)
+            
+            if params.get('type') == 'individual':
+                etag = make_etag('players', collection_version(cur, 'individual_players'))
+                if etag_matches(event, etag):
+                    return not_modified(etag)
+                
+                cached = cached_response(event, etag)
+                if cached:
+                    return cached
+                
+                status_filter = params.get('status')
+                role_filter = params.get('role')
+                page_cursor = params.get('cursor')
+                
+                try:
+                    limit = parse_limit(params.get('limit'))
+                    
+                    if limit or page_cursor or status_filter or role_filter:
+                        filters = []
+                        if status_filter:
+                            filters.append(('status = %s', status_filter))
+                        if role_filter:
+                            filters.append(('preferred_roles @> ARRAY[%s]::text[]', role_filter))
+                        
+                        sql, sql_params = build_page_query(PLAYER_ROW.select_list, 'individual_players', filters, page_cursor, limit)
+                        cur.execute(sql, sql_params)
+                    elif JSON_AGG_LISTS:
+                        execute_prepared(cur, PLAYERS_LIST_JSON)
+                        return respond(event, join_json({'players': fetch_json(cur)}), headers=etag_headers(etag), snapshot=etag)
+                    else:
+                        execute_prepared(cur, PLAYERS_LIST)
+                except PageError as e:
+                    return {
+                        'statusCode': 400,
+                        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                        'body': json.dumps({'error': str(e)}),
+                        'isBase64Encoded': False
+                    }
+                
+                players, next_cursor = split_page(cur.fetchall(), limit, PLAYER_ROW.index('created_at'))
+                result = {'players': PLAYER_ROW.to_dicts(players)}
+                if limit:
+                    result['nextCursor'] = next_cursor
+                
+                return respond(event, dumps(result), headers=etag_headers(etag), snapshot=etag)
             
             team_id = params.get('teamId')
             if team_id:
-                cur.execute(
-                    f"""SELECT id, team_name, captain_nick, captain_telegram, status, created_at,
-                              top_nick, top_telegram, jungle_nick, jungle_telegram, 
-                              mid_nick, mid_telegram, adc_nick, adc_telegram,
-                              support_nick, support_telegram, sub1_nick, sub1_telegram,
-                              sub2_nick, sub2_telegram, is_edited 
-                       FROM teams WHERE id = {team_id}"""
-                )
+                execute_prepared(cur, TEAM_BY_ID, (team_id,))
                 t = cur.fetchone()
                 
                 if not t:
@@ -100,88 +529,102 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                         'isBase64Encoded': False
                     }
                 
-                team_data = {
-                    'id': t[0],
-                    'teamName': t[1],
-                    'captainNick': t[2],
-                    'captainTelegram': t[3],
-                    'status': t[4],
-                    'createdAt': t[5].isoformat() if t[5] else None,
-                    'topNick': t[6],
-                    'topTelegram': t[7],
-                    'jungleNick': t[8],
-                    'jungleTelegram': t[9],
-                    'midNick': t[10],
-                    'midTelegram': t[11],
-                    'adcNick': t[12],
-                    'adcTelegram': t[13],
-                    'supportNick': t[14],
-                    'supportTelegram': t[15],
-                    'sub1Nick': t[16],
-                    'sub1Telegram': t[17],
-                    'sub2Nick': t[18],
-                    'sub2Telegram': t[19],
-                    'isEdited': t[20] if len(t) > 20 and t[20] is not None else False
-                }
+                team_data = TEAM_ROW.to_dict(t)
                 
+                return respond(event, dumps({'team': team_data}))
+            
+            status_filter = params.get('status', 'approved')
+            
+            etag = make_etag('teams', collection_version(cur, 'teams'))
+            if etag_matches(event, etag):
+                return not_modified(etag)
+            
+            cached = cached_response(event, etag)
+            if cached:
+                return cached
+            
+            page_cursor = params.get('cursor')
+            
+            try:
+                limit = parse_limit(params.get('limit'))
+                
+                if limit or page_cursor:
+                    sql, sql_params = build_page_query(TEAM_ROW.select_list, 'teams', [('status = %s', status_filter)], page_cursor, limit)
+                    cur.execute(sql, sql_params)
+                elif JSON_AGG_LISTS:
+                    execute_prepared(cur, TEAMS_BY_STATUS_JSON, ([status_filter],))
+                    return respond(event, join_json({'teams': fetch_json(cur)}), headers=etag_headers(etag), snapshot=etag)
+                else:
+                    execute_prepared(cur, TEAMS_BY_STATUS, ([status_filter],))
+            except PageError as e:
                 return {
-                    'statusCode': 200,
+                    'statusCode': 400,
                     'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-                    'body': json.dumps({'team': team_data}),
+                    'body': json.dumps({'error': str(e)}),
                     'isBase64Encoded': False
                 }
             
-            status_filter = params.get('status', 'approved')
-            
-            cur.execute(
-                f"""SELECT id, team_name, captain_nick, captain_telegram, status, created_at,
-                          top_nick, top_telegram, jungle_nick, jungle_telegram, 
-                          mid_nick, mid_telegram, adc_nick, adc_telegram,
-                          support_nick, support_telegram, sub1_nick, sub1_telegram,
-                          sub2_nick, sub2_telegram, is_edited, old_data 
-                   FROM teams WHERE status = '{escape_sql(status_filter)}' ORDER BY created_at DESC"""
-            )
-            teams = cur.fetchall()
-            
-            teams_list = [{
-                'id': t[0],
-                'teamName': t[1],
-                'captainNick': t[2],
-                'captainTelegram': t[3],
-                'status': t[4],
-                'createdAt': t[5].isoformat() if t[5] else None,
-                'topNick': t[6],
-                'topTelegram': t[7],
-                'jungleNick': t[8],
-                'jungleTelegram': t[9],
-                'midNick': t[10],
-                'midTelegram': t[11],
-                'adcNick': t[12],
-                'adcTelegram': t[13],
-                'supportNick': t[14],
-                'supportTelegram': t[15],
-                'sub1Nick': t[16],
-                'sub1Telegram': t[17],
-                'sub2Nick': t[18],
-                'sub2Telegram': t[19],
-                'isEdited': t[20] if len(t) > 20 and t[20] is not None else False,
-                'oldData': t[21] if len(t) > 21 and t[21] is not None else None
-            } for t in teams]
+            teams, next_cursor = split_page(cur.fetchall(), limit, TEAM_ROW.index('created_at'))
+            result = {'teams': TEAM_ROW.to_dicts(teams)}
+            if limit:
+                result['nextCursor'] = next_cursor
             
-            return {
-                'statusCode': 200,
-                'headers': {
-                    'Content-Type': 'application/json',
-                    'Access-Control-Allow-Origin': '*'
-                },
-                'body': json.dumps({'teams': teams_list}),
-                'isBase64Encoded': False
-            }
+            return respond(event, dumps(result), headers=etag_headers(etag), snapshot=etag)
         
         elif method == 'POST':
             body_data = json.loads(event.get('body', '{}'))
             
             params = event.get('queryStringParameters') or {}
+            
+            if body_data.get('action') == 'import':
+                auth_token = event.get('headers', {}).get('X-Auth-Token') or event.get('headers', {}).get('x-auth-token')
+                
+                if not resolve_admin(cur, auth_token):
+                    return {
+                        'statusCode': 403,
+                        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                        'body': json.dumps({'error': 'Требуется админ доступ'}),
+                        'isBase64Encoded': False
+                    }
+                
+                if body_data.get('type') == 'individual':
+                    target, fields, merge_sql, lock_sql = 'individual_players', PLAYER_IMPORT_FIELDS, PLAYER_IMPORT_MERGE, None
+                else:
+                    target, fields, merge_sql, lock_sql = 'teams', TEAM_IMPORT_FIELDS, TEAM_IMPORT_MERGE, TEAM_IMPORT_LOCK
+                
+                try:
+                    records = parse_upload(body_data.get('data') or '', body_data.get('format', 'csv'))
+                except UploadError as e:
+                    return {
+                        'statusCode': 400,
+                        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                        'body': json.dumps({'success': False, 'error': str(e)}),
+                        'isBase64Encoded': False
+                    }
+                
+                result = validate_rows(fields, records)
+                if result.errors:
+                    return {
+                        'statusCode': 400,
+                        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                        'body': json.dumps({'success': False, 'errors': result.errors}, ensure_ascii=False),
+                        'isBase64Encoded': False
+                    }
+                
+                copy_to_staging(cur, target, fields, result.rows)
+                match_index = next(i for i, f in enumerate(fields) if f.unique)
+                if lock_sql:
+                    cur.execute(lock_sql)
+                ids, skipped = merge_staging(cur, merge_sql, match_index, result.rows)
+                conn.commit()
+                
+                return {
+                    'statusCode': 200,
+                    'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                    'body': json.dumps({'success': True, 'imported': len(ids), 'ids': ids, 'skipped': skipped}),
+                    'isBase64Encoded': False
+                }
+            
             if params.get('action') == 'team-login' or body_data.get('action') == 'team-login':
                 team_name = body_data.get('teamName', '')
                 password = body_data.get('password', '')
@@ -197,11 +640,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 password_hash = hash_password(password)
                 
                 cur.execute(
-                    f"""SELECT id, team_name, captain_nick, captain_telegram, status,
-                              top_nick, top_telegram, jungle_nick, jungle_telegram,
-                              mid_nick, mid_telegram, adc_nick, adc_telegram,
-                              support_nick, support_telegram, sub1_nick, sub1_telegram,
-                              sub2_nick, sub2_telegram
+                    f"""SELECT {TEAM_LOGIN_ROW.select_list}
                        FROM teams 
                        WHERE team_name = '{escape_sql(team_name)}' AND password_hash = '{escape_sql(password_hash)}'"""
                 )
@@ -215,50 +654,29 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                         'isBase64Encoded': False
                     }
                 
-                team_data = {
-                    'id': team[0],
-                    'teamName': team[1],
-                    'captainNick': team[2],
-                    'captainTelegram': team[3],
-                    'status': team[4],
-                    'topNick': team[5],
-                    'topTelegram': team[6],
-                    'jungleNick': team[7],
-                    'jungleTelegram': team[8],
-                    'midNick': team[9],
-                    'midTelegram': team[10],
-                    'adcNick': team[11],
-                    'adcTelegram': team[12],
-                    'supportNick': team[13],
-                    'supportTelegram': team[14],
-                    'sub1Nick': team[15],
-                    'sub1Telegram': team[16],
-                    'sub2Nick': team[17],
-                    'sub2Telegram': team[18]
-                }
-                
-                session_token = hash_password(f"{team[3]}-{team[0]}-{context.request_id}")
-                expires_at = "NOW() + INTERVAL '7 days'"
+                team = TEAM_LOGIN_ROW.row(team)
+                team_data = TEAM_LOGIN_ROW.to_dict(team)
                 
-                cur.execute(
-                    f"""INSERT INTO user_sessions (telegram, user_type, session_token, expires_at)
-                       VALUES ('{escape_sql(team[3])}', 'team_captain', '{escape_sql(session_token)}', {expires_at})
-                       ON CONFLICT (telegram) DO UPDATE 
-                       SET session_token = '{escape_sql(session_token)}', expires_at = {expires_at}, user_type = 'team_captain'"""
-                )
-                conn.commit()
+                if SIGNED_SESSIONS:
+                    session_token = issue_session_token(team.captain_telegram, 'team_captain')
+                else:
+                    session_token = secrets.token_urlsafe(32)
+                    
+                    # user_sessions has no unique key on telegram, so every login gets its own row
+                    cur.execute(
+                        f"""INSERT INTO user_sessions (telegram, user_type, session_token, expires_at)
+                           VALUES ('{escape_sql(team.captain_telegram)}', 'team_captain', '{escape_sql(session_token)}', NOW() + INTERVAL '7 days')"""
+                    )
+                    conn.commit()
                 
                 return {
                     'statusCode': 200,
                     'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-                    'body': json.dumps({'success': True, 'team': team_data, 'sessionToken': session_token}),
+                    'body': dumps({'success': True, 'team': team_data, 'sessionToken': session_token}),
                     'isBase64Encoded': False
                 }
             
-            cur.execute("SELECT value FROM settings WHERE key = 'registration_open'")
-            reg_status = cur.fetchone()
-            
-            if reg_status and reg_status[0] == 'false':
+            if get_setting(cur, 'registration_open') is False:
                 return {
                     'statusCode': 403,
                     'headers': {
@@ -368,6 +786,36 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             team_id = body_data.get('teamId')
             action = body_data.get('action')
             
+            if action == 'batch':
+                auth_token = event.get('headers', {}).get('X-Auth-Token') or event.get('headers', {}).get('x-auth-token')
+                
+                if not resolve_admin(cur, auth_token):
+                    return {
+                        'statusCode': 403,
+                        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                        'body': json.dumps({'success': False, 'error': 'Требуется админ доступ'}),
+                        'isBase64Encoded': False
+                    }
+                
+                items = body_data.get('items')
+                if not isinstance(items, list) or not items or len(items) > MAX_BATCH_ITEMS:
+                    return {
+                        'statusCode': 400,
+                        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                        'body': json.dumps({'success': False, 'error': f'items must be a list of 1 to {MAX_BATCH_ITEMS} operations'}),
+                        'isBase64Encoded': False
+                    }
+                
+                results = apply_batch(cur, items)
+                conn.commit()
+                
+                return {
+                    'statusCode': 200,
+                    'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                    'body': json.dumps({'success': True, 'results': results}),
+                    'isBase64Encoded': False
+                }
+            
             if player_id:
                 new_status = escape_sql(body_data.get('status', ''))
                 cur.execute(
@@ -389,45 +837,39 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 auth_token = event.get('headers', {}).get('X-Auth-Token') or event.get('headers', {}).get('x-auth-token')
                 session_token = event.get('headers', {}).get('X-Session-Token') or event.get('headers', {}).get('x-session-token')
                 is_admin_update = False
-                is_captain_update = False
                 
                 if auth_token:
-                    cur.execute(
-                        f"SELECT role FROM admin_users WHERE session_token = '{escape_sql(auth_token)}'"
-                    )
-                    admin_result = cur.fetchone()
-                    is_admin_update = admin_result is not None
+                    is_admin_update = resolve_admin(cur, auth_token) is not None
                 
-                if not is_admin_update and session_token:
-                    cur.execute(
-                        f"SELECT telegram, user_type FROM user_sessions WHERE session_token = '{escape_sql(session_token)}'"
-                    )
-                    session_result = cur.fetchone()
-                    if session_result and session_result[1] == 'team_captain':
-                        telegram = session_result[0]
-                        cur.execute(
-                            f"SELECT id FROM teams WHERE id = {team_id} AND captain_telegram = '{escape_sql(telegram)}'"
-                        )
-                        team_result = cur.fetchone()
-                        if team_result:
-                            is_captain_update = True
-                
-                if not is_admin_update and not is_captain_update:
-                    return {
-                        'statusCode': 403,
-                        'headers': {
-                            'Content-Type': 'application/json',
-                            'Access-Control-Allow-Origin': '*'
-                        },
-                        'body': json.dumps({'success': False, 'error': 'Недостаточно прав для редактирования'}),
-                        'isBase64Encoded': False
-                    }
-                
-                if is_captain_update:
-                    cur.execute("SELECT value FROM settings WHERE key = 'registration_open'")
-                    reg_status = cur.fetchone()
+                if not is_admin_update:
+                    session_telegram = None
+                    legacy_token = None
+                    if session_token and session_token.startswith(TOKEN_PREFIX):
+                        session = resolve_user_session(cur, session_token)
+                        if session and session.user_type == 'team_captain':
+                            session_telegram = session.telegram
+                    else:
+                        legacy_token = session_token
                     
-                    if reg_status and reg_status[0] == 'false':
+                    execute_prepared(cur, CAPTAIN_TEAM_UPDATE, (
+                        team_id, session_telegram, legacy_token,
+                        *[body_data.get(c.key, '') for c in TEAM_SNAPSHOT_ROW.columns]
+                    ))
+                    owned, registration_open, _ = cur.fetchone()
+                    conn.commit()
+                    
+                    if not owned:
+                        return {
+                            'statusCode': 403,
+                            'headers': {
+                                'Content-Type': 'application/json',
+                                'Access-Control-Allow-Origin': '*'
+                            },
+                            'body': json.dumps({'success': False, 'error': 'Недостаточно прав для редактирования'}),
+                            'isBase64Encoded': False
+                        }
+                    
+                    if not registration_open:
                         return {
                             'statusCode': 403,
                             'headers': {
@@ -437,92 +879,20 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                             'body': json.dumps({'success': False, 'error': 'Регистрация закрыта'}),
                             'isBase64Encoded': False
                         }
+                    
+                    return {
+                        'statusCode': 200,
+                        'headers': {
+                            'Content-Type': 'application/json',
+                            'Access-Control-Allow-Origin': '*'
+                        },
+                        'body': json.dumps({'success': True}),
+                        'isBase64Encoded': False
+                    }
                 
-                if not is_admin_update:
-                    cur.execute(
-                        f"""SELECT team_name, captain_nick, captain_telegram,
-                                  top_nick, top_telegram, jungle_nick, jungle_telegram,
-                                  mid_nick, mid_telegram, adc_nick, adc_telegram,
-                                  support_nick, support_telegram, sub1_nick, sub1_telegram,
-                                  sub2_nick, sub2_telegram
-                           FROM teams WHERE id = {team_id}"""
-                    )
-                    old_team = cur.fetchone()
-                    if old_team:
-                        old_data = {
-                            'teamName': old_team[0],
-                            'captainNick': old_team[1],
-                            'captainTelegram': old_team[2],
-                            'topNick': old_team[3],
-                            'topTelegram': old_team[4],
-                            'jungleNick': old_team[5],
-                            'jungleTelegram': old_team[6],
-                            'midNick': old_team[7],
-                            'midTelegram': old_team[8],
-                            'adcNick': old_team[9],
-                            'adcTelegram': old_team[10],
-                            'supportNick': old_team[11],
-                            'supportTelegram': old_team[12],
-                            'sub1Nick': old_team[13],
-                            'sub1Telegram': old_team[14],
-                            'sub2Nick': old_team[15],
-                            'sub2Telegram': old_team[16]
-                        }
-                        old_data_json = json.dumps(old_data).replace("'", "''")
-                    else:
-                        old_data_json = 'NULL'
-                else:
-                    old_data_json = 'NULL'
-                
-                team_name = escape_sql(body_data.get('teamName', ''))
-                captain_nick = escape_sql(body_data.get('captainNick', ''))
-                captain_telegram = escape_sql(body_data.get('captainTelegram', ''))
-                top_nick = escape_sql(body_data.get('topNick', ''))
-                top_telegram = escape_sql(body_data.get('topTelegram', ''))
-                jungle_nick = escape_sql(body_data.get('jungleNick', ''))
-                jungle_telegram = escape_sql(body_data.get('jungleTelegram', ''))
-                mid_nick = escape_sql(body_data.get('midNick', ''))
-                mid_telegram = escape_sql(body_data.get('midTelegram', ''))
-                adc_nick = escape_sql(body_data.get('adcNick', ''))
-                adc_telegram = escape_sql(body_data.get('adcTelegram', ''))
-                support_nick = escape_sql(body_data.get('supportNick', ''))
-                support_telegram = escape_sql(body_data.get('supportTelegram', ''))
-                sub1_nick = escape_sql(body_data.get('sub1Nick', ''))
-                sub1_telegram = escape_sql(body_data.get('sub1Telegram', ''))
-                sub2_nick = escape_sql(body_data.get('sub2Nick', ''))
-                sub2_telegram = escape_sql(body_data.get('sub2Telegram', ''))
-                
-                if is_admin_update:
-                    cur.execute(
-                        f"""UPDATE teams SET 
-                            team_name = '{team_name}',
-                            captain_nick = '{captain_nick}', captain_telegram = '{captain_telegram}',
-                            top_nick = '{top_nick}', top_telegram = '{top_telegram}',
-                            jungle_nick = '{jungle_nick}', jungle_telegram = '{jungle_telegram}',
-                            mid_nick = '{mid_nick}', mid_telegram = '{mid_telegram}',
-                            adc_nick = '{adc_nick}', adc_telegram = '{adc_telegram}',
-                            support_nick = '{support_nick}', support_telegram = '{support_telegram}',
-                            sub1_nick = '{sub1_nick}', sub1_telegram = '{sub1_telegram}',
-                            sub2_nick = '{sub2_nick}', sub2_telegram = '{sub2_telegram}'
-                        WHERE id = {team_id}"""
-                    )
-                else:
-                    cur.execute(
-                        f"""UPDATE teams SET 
-                            team_name = '{team_name}',
-                            captain_nick = '{captain_nick}', captain_telegram = '{captain_telegram}',
-                            top_nick = '{top_nick}', top_telegram = '{top_telegram}',
-                            jungle_nick = '{jungle_nick}', jungle_telegram = '{jungle_telegram}',
-                            mid_nick = '{mid_nick}', mid_telegram = '{mid_telegram}',
-                            adc_nick = '{adc_nick}', adc_telegram = '{adc_telegram}',
-                            support_nick = '{support_nick}', support_telegram = '{support_telegram}',
-                            sub1_nick = '{sub1_nick}', sub1_telegram = '{sub1_telegram}',
-                            sub2_nick = '{sub2_nick}', sub2_telegram = '{sub2_telegram}',
-                            status = 'pending',
-                            is_edited = true,
-                            old_data = {'NULL' if old_data_json == 'NULL' else f"'{old_data_json}'"}
-                        WHERE id = {team_id}"""
-                    )
+                execute_prepared(cur, ADMIN_TEAM_UPDATE, (
+                    team_id, *[body_data.get(c.key, '') for c in TEAM_SNAPSHOT_ROW.columns]
+                ))
                 conn.commit()
                 
                 return {
@@ -539,7 +909,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             
             if new_status == 'approved':
                 cur.execute(
-                    f"UPDATE teams SET status = '{new_status}', is_edited = false, old_data = NULL WHERE id = {team_id}"
+                    f"UPDATE teams SET status = '{new_status}', is_edited = false WHERE id = {team_id}"
                 )
             else:
                 cur.execute(
@@ -570,12 +940,9 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             auth_token = event.get('headers', {}).get('X-Auth-Token') or event.get('headers', {}).get('x-auth-token')
             
             if action == 'clear_all' and auth_token:
-                cur.execute(
-                    f"SELECT role FROM admin_users WHERE session_token = '{escape_sql(auth_token)}'"
-                )
-                admin_result = cur.fetchone()
+                admin_result = resolve_admin(cur, auth_token)
                 
-                if not admin_result or admin_result[0] != 'super_admin':
+                if not admin_result or admin_result.role != 'super_admin':
                     return {
                         'statusCode': 403,
                         'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
@@ -601,10 +968,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 }
             
             if (team_id or player_id) and auth_token:
-                cur.execute(
-                    f"SELECT role FROM admin_users WHERE session_token = '{escape_sql(auth_token)}'"
-                )
-                admin_result = cur.fetchone()
+                admin_result = resolve_admin(cur, auth_token)
                 
                 if not admin_result:
                     return {
@@ -637,10 +1001,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                         'isBase64Encoded': False
                     }
                 
-                cur.execute(
-                    f"SELECT role FROM admin_users WHERE session_token = '{escape_sql(auth_token)}'"
-                )
-                admin_result = cur.fetchone()
+                admin_result = resolve_admin(cur, auth_token)
                 
                 if not admin_result:
                     return {
@@ -675,10 +1036,7 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                     'isBase64Encoded': False
                 }
             
-            cur.execute("SELECT value FROM settings WHERE key = 'registration_open'")
-            reg_status = cur.fetchone()
-            
-            if reg_status and reg_status[0] == 'false':
+            if get_setting(cur, 'registration_open') is False:
                 return {
                     'statusCode': 403,
                     'headers': {
@@ -744,4 +1102,124 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     
     finally:
         cur.close()
-        conn.close()
\ No newline at end of file
+        conn.close()
+
+async def bootstrap_async(event: Dict[str, Any], params: Dict[str, Any]) -> Dict[str, Any]:
+    pool = await get_read_pool(event)
+    
+    versions = {'teams': 0, 'individual_players': 0, 'settings': 0}
+    versions.update(dict(await fetch_prepared(pool, COLLECTION_VERSIONS, (list(versions),))))
+    section_versions = {
+        'teams': versions['teams'],
+        'players': versions['individual_players'],
+        'settings': versions['settings']
+    }
+    
+    etag = make_etag('bootstrap', section_versions['teams'], section_versions['players'], section_versions['settings'])
+    if etag_matches(event, etag):
+        return not_modified(etag)
+    
+    cached = cached_response(event, etag)
+    if cached:
+        return cached
+    
+    # Stale sections are independent, so each runs on its own pooled connection at the same time
+    queries: Dict[str, Any] = {}
+    if params.get('teamsVersion') != str(section_versions['teams']):
+        if JSON_AGG_LISTS:
+            queries['approvedTeams'] = fetchval_prepared(pool, TEAMS_BY_STATUS_JSON, (['approved'],))
+            queries['pendingTeams'] = fetchval_prepared(pool, TEAMS_BY_STATUS_JSON, (['pending'],))
+        else:
+            queries['teams'] = fetch_prepared(pool, TEAMS_BY_STATUS, (['approved', 'pending'],))
+    
+    if params.get('playersVersion') != str(section_versions['players']):
+        if JSON_AGG_LISTS:
+            queries['players'] = fetchval_prepared(pool, PLAYERS_LIST_JSON)
+        else:
+            queries['players'] = fetch_prepared(pool, PLAYERS_LIST)
+    
+    if params.get('settingsVersion') != str(section_versions['settings']):
+        queries['settings'] = fetch_prepared(pool, ALL_SETTINGS)
+    
+    fetched = dict(zip(queries, await asyncio.gather(*queries.values())))
+    
+    result: Dict[str, Any] = {'versions': section_versions}
+    
+    if 'teams' in fetched:
+        teams_list = TEAM_ROW.to_dicts(fetched['teams'])
+        result['approvedTeams'] = [t for t in teams_list if t['status'] == 'approved']
+        result['pendingTeams'] = [t for t in teams_list if t['status'] == 'pending']
+    elif 'approvedTeams' in fetched:
+        result['approvedTeams'] = RawJson(fetched['approvedTeams'])
+        result['pendingTeams'] = RawJson(fetched['pendingTeams'])
+    
+    if 'players' in fetched:
+        result['players'] = RawJson(fetched['players']) if JSON_AGG_LISTS else PLAYER_ROW.to_dicts(fetched['players'])
+    
+    if 'settings' in fetched:
+        result['settings'] = {s[0]: s[1] for s in fetched['settings']}
+    
+    return respond(event, join_json(result), headers=etag_headers(etag), snapshot=etag)
+
+
+async def team_login_async(body_data: Dict[str, Any]) -> Dict[str, Any]:
+    team_name = body_data.get('teamName', '')
+    password = body_data.get('password', '')
+    
+    if not team_name or not password:
+        return {
+            'statusCode': 400,
+            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+            'body': json.dumps({'success': False, 'error': 'Требуется название команды и пароль'}),
+            'isBase64Encoded': False
+        }
+    
+    pool = await get_pool()
+    password_hash = hash_password(password)
+    
+    if SIGNED_SESSIONS:
+        team = await fetchrow_prepared(pool, TEAM_LOGIN, (team_name, password_hash))
+    else:
+        session_token = secrets.token_urlsafe(32)
+        team = await fetchrow_prepared(pool, TEAM_LOGIN_WITH_SESSION, (team_name, password_hash, session_token))
+    
+    if not team:
+        return {
+            'statusCode': 401,
+            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+            'body': json.dumps({'success': False, 'error': 'Неверное название команды или пароль'}),
+            'isBase64Encoded': False
+        }
+    
+    team = TEAM_LOGIN_ROW.row(team)
+    if SIGNED_SESSIONS:
+        session_token = issue_session_token(team.captain_telegram, 'team_captain')
+    
+    return {
+        'statusCode': 200,
+        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+        'body': dumps({'success': True, 'team': TEAM_LOGIN_ROW.to_dict(team), 'sessionToken': session_token}),
+        'isBase64Encoded': False
+    }
+
+
+async def async_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    '''
+    Business: asyncio variant of handler() on the shared asyncpg pool - bootstrap sections load concurrently,
+              team-login is one round trip; every other request runs handler() on a worker thread
+    Args: event, context - same as handler()
+    Returns: HTTP response dict identical to handler()
+    '''
+    method: str = event.get('httpMethod', 'GET')
+    params = event.get('queryStringParameters') or {}
+    
+    if AIO_ENABLED and method == 'GET' and params.get('action') == 'bootstrap':
+        return await bootstrap_async(event, params)
+    
+    if AIO_ENABLED and method == 'POST':
+        body_data = json.loads(event.get('body', '{}'))
+        action = body_data.get('action')
+        if action == 'team-login' or (params.get('action') == 'team-login' and action != 'import'):
+            return await team_login_async(body_data)
+    
+    return await run_sync(handler, event, context)
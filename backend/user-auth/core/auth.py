@@ -0,0 +1,114 @@
+'''
+Business: Resolve admin session tokens through a small bounded LRU cache
+Args: ADMIN_TOKEN_CACHE_SIZE, ADMIN_TOKEN_CACHE_TTL, ADMIN_REVOCATION_CHECK_INTERVAL env vars (seconds);
+      cur - cursor of a pooled connection
+Returns: AdminSession(id, role, username) or None; evict_admin*() drop entries of this process at once
+
+Logout, role changes and admin deletion bump the admin_users row of data_versions. Every process compares
+that version at most once per ADMIN_REVOCATION_CHECK_INTERVAL and drops its whole cache when it moved, so
+another container honours a revoked token for at most that interval (plus replica lag on routed reads).
+'''
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, NamedTuple, Optional, Tuple
+
+from core.statements import execute_prepared, ADMIN_BY_TOKEN, COLLECTION_VERSION
+
+ADMIN_CACHE_SIZE = int(os.environ.get('ADMIN_TOKEN_CACHE_SIZE', '256'))
+ADMIN_CACHE_TTL = float(os.environ.get('ADMIN_TOKEN_CACHE_TTL', '30'))
+ADMIN_REVOCATION_CHECK_INTERVAL = float(os.environ.get('ADMIN_REVOCATION_CHECK_INTERVAL', '2'))
+
+
+class AdminSession(NamedTuple):
+    id: int
+    role: str
+    username: str
+
+
+_cache: 'OrderedDict[str, Tuple[float, AdminSession]]' = OrderedDict()
+_lock = threading.Lock()
+# (checked at, admin_users version the cache entries were resolved under)
+_revocations: Tuple[float, int] = (0.0, -1)
+
+
+def revocations_checked() -> bool:
+    return time.monotonic() - _revocations[0] < ADMIN_REVOCATION_CHECK_INTERVAL
+
+
+def apply_admin_version(version: int) -> None:
+    global _revocations
+    with _lock:
+        if version != _revocations[1]:
+            _cache.clear()
+        _revocations = (time.monotonic(), version)
+
+
+def cached_admin(token: str) -> Optional[AdminSession]:
+    # Entries are only trusted while the revocation check is recent
+    if not revocations_checked():
+        return None
+
+    now = time.monotonic()
+    with _lock:
+        entry = _cache.get(token)
+        if entry is not None:
+            if entry[0] > now:
+                _cache.move_to_end(token)
+                return entry[1]
+            del _cache[token]
+    return None
+
+
+def remember_admin(token: str, row: Any) -> AdminSession:
+    if isinstance(row, dict):
+        admin = AdminSession(row['id'], row['role'], row['username'])
+    else:
+        admin = AdminSession(row[0], row[1], row[2])
+
+    with _lock:
+        _cache[token] = (time.monotonic() + ADMIN_CACHE_TTL, admin)
+        _cache.move_to_end(token)
+        while len(_cache) > ADMIN_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+    return admin
+
+
+def resolve_admin(cur: Any, token: Optional[str]) -> Optional[AdminSession]:
+    if not token:
+        return None
+
+    admin = cached_admin(token)
+    if admin is not None:
+        return admin
+
+    if not revocations_checked():
+        execute_prepared(cur, COLLECTION_VERSION, ('admin_users',))
+        row = cur.fetchone()
+        apply_admin_version((row['version'] if isinstance(row, dict) else row[0]) if row else 0)
+
+        admin = cached_admin(token)
+        if admin is not None:
+            return admin
+
+    execute_prepared(cur, ADMIN_BY_TOKEN, (token,))
+    row = cur.fetchone()
+    if not row:
+        return None
+    return remember_admin(token, row)
+
+
+# Local only: other processes drop the token once they see the bumped admin_users version
+def evict_admin_token(token: Optional[str]) -> None:
+    if token:
+        with _lock:
+            _cache.pop(token, None)
+
+
+def evict_admin(admin_id: int) -> None:
+    with _lock:
+        for token in [t for t, (_, admin) in _cache.items() if admin.id == admin_id]:
+            del _cache[token]
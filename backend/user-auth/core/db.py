@@ -0,0 +1,209 @@
+'''
+Business: Module-level PostgreSQL connection pool shared by all backend handlers
+Args: DATABASE_URL env var; DB_POOL_MAX, DB_POOL_TIMEOUT, DB_HEALTH_CHECK_INTERVAL tune the pool
+Returns: get_connection() - per-request handle that checks out a pooled connection on first use
+'''
+
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Set
+
+import psycopg2
+import psycopg2.extensions
+from psycopg2.pool import PoolError
+
+POOL_MAX_SIZE = int(os.environ.get('DB_POOL_MAX', '4'))
+POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', '10'))
+HEALTH_CHECK_INTERVAL = float(os.environ.get('DB_HEALTH_CHECK_INTERVAL', '30'))
+
+
+class _Connection(psycopg2.extensions.connection):
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.last_used = 0.0
+        self.prepared_statements: Set[str] = set()
+
+
+class ConnectionPool:
+    def __init__(self, dsn: str, max_size: int = POOL_MAX_SIZE):
+        self.dsn = dsn
+        self.max_size = max_size
+        self._idle: List[_Connection] = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+
+    def getconn(self) -> _Connection:
+        if not self._slots.acquire(timeout=POOL_TIMEOUT):
+            raise PoolError('connection pool exhausted')
+
+        try:
+            while True:
+                with self._lock:
+                    conn = self._idle.pop() if self._idle else None
+
+                if conn is None:
+                    return psycopg2.connect(self.dsn, connection_factory=_Connection)
+
+                if self._is_healthy(conn):
+                    return conn
+
+                conn.close()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def putconn(self, conn: _Connection) -> None:
+        try:
+            if self._reset(conn):
+                conn.last_used = time.monotonic()
+                with self._lock:
+                    self._idle.append(conn)
+            else:
+                conn.close()
+        finally:
+            self._slots.release()
+
+    def closeall(self) -> None:
+        with self._lock:
+            idle, self._idle = self._idle, []
+
+        for conn in idle:
+            conn.close()
+
+    @staticmethod
+    def _is_healthy(conn: _Connection) -> bool:
+        if conn.closed:
+            return False
+
+        if time.monotonic() - conn.last_used < HEALTH_CHECK_INTERVAL:
+            return True
+
+        try:
+            with conn.cursor() as cur:
+                cur.execute('SELECT 1')
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    @staticmethod
+    def _reset(conn: _Connection) -> bool:
+        if conn.closed:
+            return False
+
+        try:
+            status = conn.info.transaction_status
+            if status == psycopg2.extensions.TRANSACTION_STATUS_UNKNOWN:
+                return False
+            if status != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(dsn: str) -> ConnectionPool:
+    pool = _pools.get(dsn)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(dsn)
+            if pool is None:
+                pool = _pools[dsn] = ConnectionPool(dsn)
+    return pool
+
+
+def close_pools() -> None:
+    with _pools_lock:
+        pools = list(_pools.values())
+
+    for pool in pools:
+        pool.closeall()
+
+
+class LazyCursor:
+    '''Cursor proxy that only checks out a connection when first used.'''
+
+    def __init__(self, conn: 'PooledConnection', cursor_factory: Any = None):
+        self._conn = conn
+        self._cursor_factory = cursor_factory
+        self._cursor: Optional[psycopg2.extensions.cursor] = None
+
+    def _real(self) -> psycopg2.extensions.cursor:
+        if self._cursor is None:
+            self._cursor = self._conn.raw.cursor(cursor_factory=self._cursor_factory)
+        return self._cursor
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._real(), name)
+
+    def __iter__(self):
+        return iter(self._real())
+
+    def __enter__(self) -> 'LazyCursor':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._cursor is not None and not self._cursor.closed:
+            self._cursor.close()
+
+
+class PooledConnection:
+    '''Per-request connection handle; close() returns the connection to the pool.'''
+
+    def __init__(self, dsn: str, cursor_factory: Any = None, fallback: Optional[Callable[[], str]] = None):
+        self._pool = get_pool(dsn)
+        self._cursor_factory = cursor_factory
+        self._conn: Optional[_Connection] = None
+        self._fallback = fallback
+
+    @property
+    def raw(self) -> _Connection:
+        if self._conn is None:
+            try:
+                self._conn = self._pool.getconn()
+            except psycopg2.OperationalError:
+                # fallback() names another server (the primary for replica reads) to try once
+                if self._fallback is None:
+                    raise
+                self._pool = get_pool(self._fallback())
+                self._fallback = None
+                self._conn = self._pool.getconn()
+        return self._conn
+
+    @property
+    def acquired(self) -> bool:
+        return self._conn is not None
+
+    def cursor(self, cursor_factory: Any = None) -> LazyCursor:
+        return LazyCursor(self, cursor_factory or self._cursor_factory)
+
+    def commit(self) -> None:
+        if self._conn is not None:
+            self._conn.commit()
+
+    def rollback(self) -> None:
+        if self._conn is not None:
+            self._conn.rollback()
+
+    def close(self) -> None:
+        if self._conn is not None:
+            conn, self._conn = self._conn, None
+            self._pool.putconn(conn)
+
+    def __enter__(self) -> 'PooledConnection':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def get_connection(cursor_factory: Any = None, dsn: Optional[str] = None) -> PooledConnection:
+    return PooledConnection(dsn or os.environ['DATABASE_URL'], cursor_factory)
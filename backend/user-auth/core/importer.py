@@ -0,0 +1,168 @@
+'''
+Business: Admin bulk import - validate an uploaded CSV/NDJSON file, COPY it into a staging table, merge in one statement
+Args: data - file contents; fields - ImportField per importable column; MAX_IMPORT_ROWS env var
+Returns: validated rows or per-row errors; ids and skipped lines of the merge
+'''
+
+import csv
+import io
+import json
+import os
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from core.export import csv_value
+
+MAX_IMPORT_ROWS = int(os.environ.get('MAX_IMPORT_ROWS', '5000'))
+
+TRUE_VALUES = {'true', 't', '1', 'yes'}
+FALSE_VALUES = {'false', 'f', '0', 'no', ''}
+
+
+class UploadError(ValueError):
+    pass
+
+
+class ImportField(NamedTuple):
+    column: str
+    key: str
+    kind: str = 'text'
+    required: bool = False
+    default: Any = None
+    choices: Optional[Tuple[str, ...]] = None
+    unique: bool = False
+    transform: Optional[Callable[[Any], Any]] = None
+
+
+class ImportResult(NamedTuple):
+    rows: List[Tuple[Any, ...]]
+    errors: List[Dict[str, Any]]
+
+
+def parse_array(value: Any) -> List[str]:
+    if isinstance(value, list):
+        return [str(v) for v in value]
+
+    text = str(value).strip()
+    if text.startswith('{') and text.endswith('}'):
+        text = text[1:-1]
+        if not text:
+            return []
+        # PostgreSQL array literal as written by the CSV export: quoted items escape with backslashes
+        return next(csv.reader([text], quotechar='"', escapechar='\\', doublequote=False))
+    return [item.strip() for item in text.replace(';', ',').split(',') if item.strip()]
+
+
+def parse_upload(data: str, upload_format: str) -> List[Tuple[int, Any]]:
+    if upload_format == 'csv':
+        reader = csv.DictReader(io.StringIO(data))
+        records = [(reader.line_num, row) for row in reader]
+    elif upload_format == 'ndjson':
+        records = []
+        for line_number, line in enumerate(data.splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                records.append((line_number, json.loads(line)))
+            except ValueError:
+                records.append((line_number, None))
+    else:
+        raise UploadError('Invalid import format')
+
+    if not records:
+        raise UploadError('Import file is empty')
+    if len(records) > MAX_IMPORT_ROWS:
+        raise UploadError(f'Import is limited to {MAX_IMPORT_ROWS} rows')
+    return records
+
+
+def convert_value(field: ImportField, value: Any) -> Any:
+    if field.kind == 'array':
+        return parse_array(value)
+    if field.kind == 'bool':
+        if isinstance(value, bool):
+            return value
+        text = str(value).strip().lower()
+        if text in TRUE_VALUES:
+            return True
+        if text in FALSE_VALUES:
+            return False
+        raise ValueError('expected true or false')
+    return str(value).strip()
+
+
+def validate_rows(fields: Sequence[ImportField], records: List[Tuple[int, Any]]) -> ImportResult:
+    # Only the API keys are read: a column name such as password_hash must not be taken for the field it stores
+    rows: List[Tuple[Any, ...]] = []
+    errors: List[Dict[str, Any]] = []
+    seen: Dict[str, Set[Any]] = {f.column: set() for f in fields if f.unique}
+
+    for line, record in records:
+        if not isinstance(record, dict):
+            errors.append({'line': line, 'error': 'Invalid JSON object'})
+            continue
+
+        values: List[Any] = []
+        row_errors: List[str] = []
+        for field in fields:
+            raw = record.get(field.key)
+            if raw is None or raw == '':
+                if field.required:
+                    row_errors.append(f'{field.key} is required')
+                    values.append(None)
+                    continue
+                value = field.default
+            else:
+                try:
+                    value = convert_value(field, raw)
+                except ValueError as e:
+                    row_errors.append(f'{field.key}: {e}')
+                    values.append(None)
+                    continue
+
+            if field.choices and value not in field.choices:
+                row_errors.append(f"{field.key} must be one of {', '.join(field.choices)}")
+            if field.unique and value is not None:
+                if value in seen[field.column]:
+                    row_errors.append(f'{field.key} is duplicated in the file')
+                seen[field.column].add(value)
+            if field.transform is not None and value is not None:
+                value = field.transform(value)
+            values.append(value)
+
+        if row_errors:
+            errors.append({'line': line, 'error': '; '.join(row_errors)})
+        else:
+            rows.append((*values, line))
+
+    return ImportResult(rows, errors)
+
+
+def copy_to_staging(cur: Any, target: str, fields: Sequence[ImportField], rows: List[Tuple[Any, ...]]) -> str:
+    staging = f'import_{target}'
+    columns = ', '.join(f.column for f in fields)
+    cur.execute(
+        f"""CREATE TEMP TABLE {staging} ON COMMIT DROP AS
+            SELECT {columns}, 0 AS line FROM {target} WITH NO DATA"""
+    )
+
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write(','.join([csv_value(v) for v in row]) + '\n')
+    buffer.seek(0)
+    cur.copy_expert(f'COPY {staging} ({columns}, line) FROM STDIN WITH (FORMAT csv)', buffer)
+    return staging
+
+
+def merge_staging(cur: Any, merge_sql: str, match_index: int, rows: List[Tuple[Any, ...]]) -> Tuple[List[int], List[Dict[str, Any]]]:
+    # merge_sql returns (id, match value) for every inserted row; anything else was already present
+    cur.execute(merge_sql)
+    inserted = {row[1]: row[0] for row in cur.fetchall()}
+
+    ids = []
+    skipped = []
+    for row in rows:
+        if row[match_index] in inserted:
+            ids.append(inserted[row[match_index]])
+        else:
+            skipped.append({'line': row[-1], 'error': 'Already exists'})
+    return ids, skipped
@@ -6,13 +6,69 @@ Returns: HTTP response with session token or error
 
 import json
 import os
+import sys
 import hashlib
 import secrets
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Dict, Any, Optional
-import psycopg2
 from psycopg2.extras import RealDictCursor
 
+# core/ is vendored into every function by vendor_core.py, so each deploy unit imports its own copy
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from core.db import get_connection
+from core.sessions import maybe_sweep_sessions
+from core.statements import execute_prepared, register_statement
+from core.tokens import SIGNED_SESSIONS, TOKEN_PREFIX, issue_session_token, resolve_user_session, revoke_session_token
+
+# A telegram may belong to a captain or a player; captains win, as with the old sequential lookups
+ACCOUNT_SQL = """
+    SELECT 'team_captain'::text AS user_type, id, team_name, captain_nick AS nick, NULL::varchar AS preferred_role, status, 1 AS priority
+    FROM teams WHERE captain_telegram = $1 AND password_hash = $2
+    UNION ALL
+    SELECT 'individual_player', id, NULL, nickname, preferred_role, status, 2
+    FROM individual_players WHERE telegram = $1 AND password_hash = $2
+    ORDER BY priority
+    LIMIT 1"""
+
+PROFILE_SQL = """
+    SELECT id, team_name, captain_nick AS nick, NULL::varchar AS preferred_role, status
+    FROM teams WHERE {user_type} = 'team_captain' AND captain_telegram = {telegram}
+    UNION ALL
+    SELECT id, NULL, nickname, preferred_role, status
+    FROM individual_players WHERE {user_type} <> 'team_captain' AND telegram = {telegram}
+    LIMIT 1"""
+
+USER_LOGIN = register_statement(
+    'user_login',
+    f'SELECT user_type, id, team_name, nick, preferred_role, status FROM ({ACCOUNT_SQL}) account'
+)
+
+USER_LOGIN_WITH_SESSION = register_statement(
+    'user_login_with_session',
+    f"""WITH account AS ({ACCOUNT_SQL}),
+       session AS (
+           INSERT INTO user_sessions (telegram, user_type, session_token, expires_at)
+           SELECT $1, user_type, $3, NOW() + INTERVAL '7 days' FROM account
+           RETURNING session_token
+       )
+       SELECT account.user_type, account.id, account.team_name, account.nick, account.preferred_role, account.status
+       FROM account CROSS JOIN session"""
+)
+
+USER_SESSION_PROFILE = register_statement(
+    'user_session_profile',
+    f"""SELECT s.user_type, s.expires_at, p.id, p.team_name, p.nick, p.preferred_role, p.status
+       FROM user_sessions s
+       LEFT JOIN LATERAL ({PROFILE_SQL.format(user_type='s.user_type', telegram='s.telegram')}) p ON true
+       WHERE s.session_token = $1"""
+)
+
+USER_PROFILE = register_statement(
+    'user_profile',
+    f"SELECT $1::text AS user_type, p.* FROM ({PROFILE_SQL.format(user_type='$1', telegram='$2')}) p"
+)
+
 def escape_sql(value: str) -> str:
     return value.replace("'", "''")
 
@@ -22,9 +78,26 @@ def hash_password(password: str) -> str:
 def generate_token() -> str:
     return secrets.token_urlsafe(32)
 
+def account_fields(row: Dict[str, Any]) -> Dict[str, Any]:
+    if row['user_type'] == 'team_captain':
+        return {
+            'userType': 'team_captain',
+            'teamId': row['id'],
+            'teamName': row['team_name'],
+            'captainNick': row['nick'],
+            'teamStatus': row['status']
+        }
+    return {
+        'userType': 'individual_player',
+        'playerId': row['id'],
+        'nickname': row['nick'],
+        'preferredRole': row['preferred_role'],
+        'playerStatus': row['status']
+    }
+
 def get_db_connection():
     database_url = os.environ.get('DATABASE_URL')
-    return psycopg2.connect(database_url, cursor_factory=RealDictCursor)
+    return get_connection(cursor_factory=RealDictCursor, dsn=database_url)
 
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     method: str = event.get('httpMethod', 'GET')
@@ -62,66 +135,30 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 
                 password_hash = hash_password(password)
                 
-                cur.execute(
-                    f"SELECT id, team_name, captain_nick, status FROM teams WHERE captain_telegram = '{escape_sql(telegram)}' AND password_hash = '{escape_sql(password_hash)}'"
-                )
-                team = cur.fetchone()
-                
-                if team:
+                # One round trip: the account lookup, and without signed tokens the session insert too
+                if SIGNED_SESSIONS:
+                    execute_prepared(cur, USER_LOGIN, (telegram, password_hash))
+                    account = cur.fetchone()
+                    session_token = issue_session_token(telegram, account['user_type']) if account else None
+                else:
                     session_token = generate_token()
-                    expires_at = datetime.now() + timedelta(days=7)
-                    
-                    cur.execute(
-                        f"INSERT INTO user_sessions (telegram, user_type, session_token, expires_at) VALUES ('{escape_sql(telegram)}', 'team_captain', '{escape_sql(session_token)}', '{expires_at}')"
-                    )
+                    execute_prepared(cur, USER_LOGIN_WITH_SESSION, (telegram, password_hash, session_token))
+                    account = cur.fetchone()
                     conn.commit()
-                    
-                    return {
-                        'statusCode': 200,
-                        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-                        'body': json.dumps({
-                            'success': True,
-                            'token': session_token,
-                            'userType': 'team_captain',
-                            'teamId': team['id'],
-                            'teamName': team['team_name'],
-                            'captainNick': team['captain_nick'],
-                            'teamStatus': team['status']
-                        })
-                    }
                 
-                cur.execute(
-                    f"SELECT id, nickname, preferred_role, status FROM individual_players WHERE telegram = '{escape_sql(telegram)}' AND password_hash = '{escape_sql(password_hash)}'"
-                )
-                player = cur.fetchone()
-                
-                if player:
-                    session_token = generate_token()
-                    expires_at = datetime.now() + timedelta(days=7)
-                    
-                    cur.execute(
-                        f"INSERT INTO user_sessions (telegram, user_type, session_token, expires_at) VALUES ('{escape_sql(telegram)}', 'individual_player', '{escape_sql(session_token)}', '{expires_at}')"
-                    )
-                    conn.commit()
-                    
+                if not account:
                     return {
-                        'statusCode': 200,
+                        'statusCode': 401,
                         'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-                        'body': json.dumps({
-                            'success': True,
-                            'token': session_token,
-                            'userType': 'individual_player',
-                            'playerId': player['id'],
-                            'nickname': player['nickname'],
-                            'preferredRole': player['preferred_role'],
-                            'playerStatus': player['status']
-                        })
+                        'body': json.dumps({'error': 'Неверный логин или пароль'})
                     }
                 
+                maybe_sweep_sessions(conn)
+                
                 return {
-                    'statusCode': 401,
+                    'statusCode': 200,
                     'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-                    'body': json.dumps({'error': 'Неверный логин или пароль'})
+                    'body': json.dumps({'success': True, 'token': session_token, **account_fields(account)})
                 }
             
             elif action == 'verify':
@@ -134,10 +171,19 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                         'body': json.dumps({'error': 'Токен обязателен'})
                     }
                 
-                cur.execute(
-                    f"SELECT telegram, user_type, expires_at FROM user_sessions WHERE session_token = '{escape_sql(token)}'"
-                )
-                session = cur.fetchone()
+                # Signed tokens carry their session, opaque ones are joined with the profile in one statement
+                if token.startswith(TOKEN_PREFIX):
+                    session = resolve_user_session(cur, token)
+                    profile = None
+                    if session:
+                        execute_prepared(cur, USER_PROFILE, (session.user_type, session.telegram))
+                        profile = cur.fetchone()
+                        expires_at = session.expires_at
+                else:
+                    execute_prepared(cur, USER_SESSION_PROFILE, (token,))
+                    session = profile = cur.fetchone()
+                    if session:
+                        expires_at = session['expires_at']
                 
                 if not session:
                     return {
@@ -146,54 +192,22 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                         'body': json.dumps({'error': 'Недействительный токен'})
                     }
                 
-                if datetime.now() > session['expires_at']:
-                    cur.execute(f"DELETE FROM user_sessions WHERE session_token = '{escape_sql(token)}'")
-                    conn.commit()
+                if datetime.now() > expires_at:
+                    if not token.startswith(TOKEN_PREFIX):
+                        cur.execute("DELETE FROM user_sessions WHERE session_token = %s", (token,))
+                        conn.commit()
                     return {
                         'statusCode': 401,
                         'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
                         'body': json.dumps({'error': 'Токен истек'})
                     }
                 
-                if session['user_type'] == 'team_captain':
-                    cur.execute(
-                        f"SELECT id, team_name, captain_nick, status FROM teams WHERE captain_telegram = '{escape_sql(session['telegram'])}'"
-                    )
-                    team = cur.fetchone()
-                    
-                    if team:
-                        return {
-                            'statusCode': 200,
-                            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-                            'body': json.dumps({
-                                'valid': True,
-                                'userType': 'team_captain',
-                                'teamId': team['id'],
-                                'teamName': team['team_name'],
-                                'captainNick': team['captain_nick'],
-                                'teamStatus': team['status']
-                            })
-                        }
-                
-                else:
-                    cur.execute(
-                        f"SELECT id, nickname, preferred_role, status FROM individual_players WHERE telegram = '{escape_sql(session['telegram'])}'"
-                    )
-                    player = cur.fetchone()
-                    
-                    if player:
-                        return {
-                            'statusCode': 200,
-                            'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
-                            'body': json.dumps({
-                                'valid': True,
-                                'userType': 'individual_player',
-                                'playerId': player['id'],
-                                'nickname': player['nickname'],
-                                'preferredRole': player['preferred_role'],
-                                'playerStatus': player['status']
-                            })
-                        }
+                if profile and profile['id'] is not None:
+                    return {
+                        'statusCode': 200,
+                        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+                        'body': json.dumps({'valid': True, **account_fields(profile)})
+                    }
                 
                 return {
                     'statusCode': 401,
@@ -205,7 +219,10 @@ def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 token = body_data.get('token')
                 
                 if token:
-                    cur.execute(f"DELETE FROM user_sessions WHERE session_token = '{escape_sql(token)}'")
+                    if token.startswith(TOKEN_PREFIX):
+                        revoke_session_token(cur, token)
+                    else:
+                        cur.execute(f"DELETE FROM user_sessions WHERE session_token = '{escape_sql(token)}'")
                     conn.commit()
                 
                 return {
@@ -0,0 +1,126 @@
+'''
+Business: Benchmark list endpoints with Python row encoding against PostgreSQL json_agg bodies
+Args: DATABASE_URL env var; BENCH_ROWS - rows to seed per table (removed afterwards, 0 uses existing data);
+      BENCH_RUNS - calls per endpoint; BENCH_ADMIN_TOKEN - admin session for schedule and admin list
+Returns: median handler time and body size per endpoint for JSON_AGG_LISTS=false and true
+'''
+
+import importlib
+import importlib.util
+import json
+import os
+import statistics
+import sys
+import time
+import types
+
+import psycopg2
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend')
+sys.path.insert(0, BACKEND_DIR)
+
+import core.rows
+
+BENCH_ROWS = int(os.environ.get('BENCH_ROWS', '2000'))
+BENCH_RUNS = int(os.environ.get('BENCH_RUNS', '30'))
+ADMIN_TOKEN = os.environ.get('BENCH_ADMIN_TOKEN', '')
+
+ENDPOINTS = [
+    ('teams list', 'teams', {'status': 'approved'}, {}),
+    ('players list', 'teams', {'type': 'individual'}, {}),
+    ('bootstrap', 'teams', {'action': 'bootstrap'}, {}),
+    ('schedule', 'schedule', {}, {'X-Admin-Token': ADMIN_TOKEN}),
+    ('admin list', 'auth', {'action': 'list_admins'}, {'X-Auth-Token': ADMIN_TOKEN}),
+]
+
+SEED_SQL = [
+    """INSERT INTO teams (team_name, captain_nick, captain_telegram, password_hash,
+                          top_nick, top_telegram, jungle_nick, jungle_telegram, mid_nick, mid_telegram,
+                          adc_nick, adc_telegram, support_nick, support_telegram, status)
+       SELECT 'bench-' || g, 'captain' || g, '@bench_captain' || g, md5(g::text),
+              'top' || g, '@top' || g, 'jungle' || g, '@jungle' || g, 'mid' || g, '@mid' || g,
+              'adc' || g, '@adc' || g, 'support' || g, '@support' || g,
+              CASE WHEN g %% 2 = 0 THEN 'approved' ELSE 'pending' END
+       FROM generate_series(1, %(rows)s) g""",
+    """INSERT INTO individual_players (nickname, telegram, password_hash, preferred_roles, status)
+       SELECT 'bench-' || g, '@bench_player' || g, '', ARRAY['mid', 'top'], 'approved'
+       FROM generate_series(1, %(rows)s) g""",
+    """INSERT INTO schedule_teams (name) VALUES ('bench-a'), ('bench-b')""",
+    """INSERT INTO matches (match_date, match_time, team1_id, team2_id, team1_name, team2_name, round, status)
+       SELECT CURRENT_DATE + (g %% 30), '18:00',
+              (SELECT id FROM schedule_teams WHERE name = 'bench-a'),
+              (SELECT id FROM schedule_teams WHERE name = 'bench-b'),
+              'bench-a', 'bench-b', 'Group', 'waiting'
+       FROM generate_series(1, %(rows)s) g""",
+]
+
+CLEANUP_SQL = [
+    "DELETE FROM matches WHERE team1_name = 'bench-a'",
+    "DELETE FROM schedule_teams WHERE name IN ('bench-a', 'bench-b')",
+    "DELETE FROM individual_players WHERE nickname LIKE 'bench-%%'",
+    "DELETE FROM teams WHERE team_name LIKE 'bench-%%'",
+]
+
+
+def run_sql(statements: list) -> None:
+    conn = psycopg2.connect(os.environ['DATABASE_URL'])
+    try:
+        with conn.cursor() as cur:
+            for sql in statements:
+                cur.execute(sql, {'rows': BENCH_ROWS})
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def load_handlers(json_agg: bool) -> dict:
+    os.environ['JSON_AGG_LISTS'] = 'true' if json_agg else 'false'
+    importlib.reload(core.rows)
+
+    handlers = {}
+    for name in {endpoint[1] for endpoint in ENDPOINTS}:
+        path = os.path.join(BACKEND_DIR, name, 'index.py')
+        spec = importlib.util.spec_from_file_location(f'bench_{name}_{json_agg}', path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        handlers[name] = module.handler
+    return handlers
+
+
+def measure(handlers: dict) -> dict:
+    context = types.SimpleNamespace(request_id='bench', function_name='bench')
+    results = {}
+    for label, name, query, headers in ENDPOINTS:
+        event = {'httpMethod': 'GET', 'queryStringParameters': query, 'headers': headers, 'body': ''}
+        timings = []
+        body = ''
+        for _ in range(BENCH_RUNS):
+            started = time.perf_counter()
+            response = handlers[name](event, context)
+            timings.append((time.perf_counter() - started) * 1000)
+            body = response['body']
+        results[label] = (statistics.median(timings), len(body), json.loads(body) if body else None)
+    return results
+
+
+def main() -> int:
+    if BENCH_ROWS:
+        run_sql(SEED_SQL)
+
+    try:
+        python_results = measure(load_handlers(False))
+        postgres_results = measure(load_handlers(True))
+    finally:
+        if BENCH_ROWS:
+            run_sql(CLEANUP_SQL)
+
+    print(f'{"endpoint":14} {"python ms":>10} {"json_agg ms":>12} {"python bytes":>13} {"json_agg bytes":>15}  same')
+    for label, _, _, _ in ENDPOINTS:
+        py_ms, py_size, py_body = python_results[label]
+        pg_ms, pg_size, pg_body = postgres_results[label]
+        print(f'{label:14} {py_ms:10.2f} {pg_ms:12.2f} {py_size:13} {pg_size:15}  {py_body == pg_body}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
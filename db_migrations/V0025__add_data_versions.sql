@@ -0,0 +1,38 @@
+-- Per-collection write counters used as ETags for the list endpoints
+CREATE TABLE IF NOT EXISTS data_versions (
+    collection VARCHAR(100) PRIMARY KEY,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT INTO data_versions (collection) VALUES
+    ('teams'),
+    ('individual_players'),
+    ('settings'),
+    ('matches')
+ON CONFLICT (collection) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_data_version() RETURNS trigger AS $$
+BEGIN
+    UPDATE data_versions
+    SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+    WHERE collection = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER teams_bump_data_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON teams
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version();
+
+CREATE TRIGGER individual_players_bump_data_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON individual_players
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version();
+
+CREATE TRIGGER settings_bump_data_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON settings
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version();
+
+CREATE TRIGGER matches_bump_data_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON matches
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version();
@@ -0,0 +1,40 @@
+-- Change cursor for delta sync of the match schedule
+CREATE SEQUENCE IF NOT EXISTS matches_change_seq;
+
+ALTER TABLE matches ADD COLUMN IF NOT EXISTS change_seq BIGINT NOT NULL DEFAULT nextval('matches_change_seq');
+
+CREATE INDEX IF NOT EXISTS idx_matches_change_seq ON matches(change_seq);
+
+-- Tombstones so clients polling with a cursor learn about deleted matches
+CREATE TABLE IF NOT EXISTS match_deletions (
+    match_id INTEGER PRIMARY KEY,
+    change_seq BIGINT NOT NULL DEFAULT nextval('matches_change_seq'),
+    deleted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_match_deletions_change_seq ON match_deletions(change_seq);
+
+CREATE OR REPLACE FUNCTION touch_match_change_seq() RETURNS trigger AS $$
+BEGIN
+    NEW.change_seq := nextval('matches_change_seq');
+    NEW.updated_at := CURRENT_TIMESTAMP;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER matches_touch_change_seq
+    BEFORE UPDATE ON matches
+    FOR EACH ROW EXECUTE FUNCTION touch_match_change_seq();
+
+CREATE OR REPLACE FUNCTION record_match_deletion() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO match_deletions (match_id) VALUES (OLD.id)
+    ON CONFLICT (match_id) DO UPDATE
+    SET change_seq = nextval('matches_change_seq'), deleted_at = CURRENT_TIMESTAMP;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER matches_record_deletion
+    AFTER DELETE ON matches
+    FOR EACH ROW EXECUTE FUNCTION record_match_deletion();
@@ -0,0 +1,2 @@
+-- Индекс для поиска администратора по токену сессии
+CREATE INDEX IF NOT EXISTS idx_admin_users_session_token ON admin_users(session_token);
@@ -0,0 +1,5 @@
+-- Индексы для keyset-пагинации списков команд и игроков по (created_at, id)
+CREATE INDEX IF NOT EXISTS idx_teams_status_created ON teams(status, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_individual_players_created ON individual_players(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_individual_players_status_created ON individual_players(status, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_individual_players_preferred_roles ON individual_players USING GIN (preferred_roles);
@@ -0,0 +1,5 @@
+-- Indexes for the lookups the backend handlers perform on every request
+-- individual_players.telegram and schedule_teams.name are already covered by their UNIQUE constraints
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_teams_name_password ON teams(team_name, password_hash);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_teams_captain_telegram ON teams(captain_telegram, password_hash);
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_matches_date_time ON matches(match_date, match_time);
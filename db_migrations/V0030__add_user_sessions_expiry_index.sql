@@ -0,0 +1,5 @@
+-- Supports the batched sweep of expired sessions (DELETE ... WHERE expires_at < NOW())
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_user_sessions_expires_at ON user_sessions(expires_at);
+
+-- session_token is already indexed by its UNIQUE constraint; the second index only doubled write and storage cost
+DROP INDEX CONCURRENTLY IF EXISTS idx_user_sessions_token;
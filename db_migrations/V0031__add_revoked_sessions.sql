@@ -0,0 +1,8 @@
+-- Logged-out signed session tokens; rows are only needed until the token would have expired anyway
+CREATE TABLE IF NOT EXISTS revoked_sessions (
+    jti VARCHAR(64) PRIMARY KEY,
+    expires_at TIMESTAMP NOT NULL,
+    revoked_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_revoked_sessions_expires_at ON revoked_sessions(expires_at);
@@ -0,0 +1,36 @@
+-- Append-only history of team edits: one row per edit with only the changed fields, {"topNick": ["old", "new"], ...}
+CREATE TABLE IF NOT EXISTS team_revisions (
+    id BIGSERIAL PRIMARY KEY,
+    team_id INTEGER NOT NULL REFERENCES teams(id) ON DELETE CASCADE,
+    changes JSONB NOT NULL,
+    edited_by VARCHAR(20) NOT NULL DEFAULT 'captain',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_team_revisions_team ON team_revisions(team_id, id);
+
+-- Carry the last snapshot of teams still waiting for review over as their latest revision
+INSERT INTO team_revisions (team_id, changes)
+SELECT t.id, diff.changes
+FROM teams t
+CROSS JOIN LATERAL (
+    SELECT jsonb_object_agg(o.key, jsonb_build_array(o.value, n.value)) AS changes
+    FROM jsonb_each(t.old_data) o
+    JOIN jsonb_each(jsonb_build_object(
+        'teamName', t.team_name,
+        'captainNick', t.captain_nick, 'captainTelegram', t.captain_telegram,
+        'topNick', t.top_nick, 'topTelegram', t.top_telegram,
+        'jungleNick', t.jungle_nick, 'jungleTelegram', t.jungle_telegram,
+        'midNick', t.mid_nick, 'midTelegram', t.mid_telegram,
+        'adcNick', t.adc_nick, 'adcTelegram', t.adc_telegram,
+        'supportNick', t.support_nick, 'supportTelegram', t.support_telegram,
+        'sub1Nick', t.sub1_nick, 'sub1Telegram', t.sub1_telegram,
+        'sub2Nick', t.sub2_nick, 'sub2Telegram', t.sub2_telegram
+    )) n USING (key)
+    WHERE o.value IS DISTINCT FROM n.value
+) diff
+WHERE t.old_data IS NOT NULL AND diff.changes IS NOT NULL;
+
+-- old_data is no longer written; it stays until the carried-over revisions are checked against it,
+-- and a later migration drops it
+COMMENT ON COLUMN teams.old_data IS 'Superseded by team_revisions; kept until the V0032 backfill is verified';
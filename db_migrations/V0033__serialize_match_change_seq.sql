@@ -0,0 +1,36 @@
+-- nextval() hands out change_seq in call order, not commit order: a poll between a later writer's commit
+-- and an earlier one's would advance the client cursor past a change it never saw. Writers now take a
+-- transaction-scoped lock before drawing a number, so numbers are drawn in commit order: a client that
+-- sees change_seq N+1 also sees every N
+CREATE OR REPLACE FUNCTION next_match_change_seq() RETURNS BIGINT AS $$
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('matches_change_seq'));
+    RETURN nextval('matches_change_seq');
+END;
+$$ LANGUAGE plpgsql;
+
+ALTER TABLE matches ALTER COLUMN change_seq SET DEFAULT next_match_change_seq();
+ALTER TABLE match_deletions ALTER COLUMN change_seq SET DEFAULT next_match_change_seq();
+
+CREATE OR REPLACE FUNCTION touch_match_change_seq() RETURNS trigger AS $$
+BEGIN
+    NEW.change_seq := next_match_change_seq();
+    NEW.updated_at := CURRENT_TIMESTAMP;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION record_match_deletion() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO match_deletions (match_id) VALUES (OLD.id)
+    ON CONFLICT (match_id) DO UPDATE
+    SET change_seq = next_match_change_seq(), deleted_at = CURRENT_TIMESTAMP;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Highest change_seq of a pruned tombstone: clients with an older cursor may have missed a deletion
+INSERT INTO data_versions (collection, version) VALUES ('match_deletions_horizon', 0)
+ON CONFLICT (collection) DO NOTHING;
+
+CREATE INDEX IF NOT EXISTS idx_match_deletions_deleted_at ON match_deletions(deleted_at);
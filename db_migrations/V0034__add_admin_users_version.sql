@@ -0,0 +1,8 @@
+-- Admin token caches in every container compare this version, so logout, role changes and admin deletion
+-- reach all of them instead of only the process that handled the request
+INSERT INTO data_versions (collection) VALUES ('admin_users')
+ON CONFLICT (collection) DO NOTHING;
+
+CREATE TRIGGER admin_users_bump_data_version
+    AFTER UPDATE OF session_token, role OR DELETE OR TRUNCATE ON admin_users
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version();
@@ -0,0 +1,2 @@
+-- Set by captain and admin edits, so the moderation view can tell when a pending team changed again
+ALTER TABLE teams ADD COLUMN IF NOT EXISTS updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP;
@@ -0,0 +1,280 @@
+'''
+Business: Self-host the cloud function handlers behind a concurrent HTTP server instead of the managed platform
+Args: DATABASE_URL env var; SERVER_HOST, SERVER_PORT; SERVER_WORKERS - processes; SERVER_THREADS - handler threads
+      per process (also the default DB_POOL_MAX); SERVER_MAX_BODY - request body limit in bytes;
+      SERVER_ASYNC_HANDLERS - 'false' keeps ASGI requests off the async_handler() variants (used when asyncpg is installed)
+Returns: app - ASGI application (uvicorn serve:app --workers N); wsgi_app - WSGI application
+         (gunicorn serve:wsgi_app --workers N --threads T); main() serves with uvicorn, or wsgiref when it is missing
+'''
+
+import asyncio
+import base64
+import importlib.util
+import json
+import logging
+import os
+import sys
+import traceback
+import types
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from http import HTTPStatus
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+SERVER_HOST = os.environ.get('SERVER_HOST', '0.0.0.0')
+SERVER_PORT = int(os.environ.get('SERVER_PORT', '8000'))
+SERVER_WORKERS = int(os.environ.get('SERVER_WORKERS', str(os.cpu_count() or 1)))
+SERVER_THREADS = int(os.environ.get('SERVER_THREADS', '8'))
+SERVER_MAX_BODY = int(os.environ.get('SERVER_MAX_BODY', str(10 * 1024 * 1024)))
+SERVER_ASYNC_HANDLERS = os.environ.get('SERVER_ASYNC_HANDLERS', 'true') == 'true'
+
+# Every handler thread may hold one pooled connection; core.db reads this when the handlers are loaded
+os.environ.setdefault('DB_POOL_MAX', str(SERVER_THREADS))
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend')
+
+logger = logging.getLogger('serve')
+
+
+def load_gateway() -> Any:
+    # The api gateway's route table dispatches to all six function handlers
+    spec = importlib.util.spec_from_file_location('api_index', os.path.join(BACKEND_DIR, 'api', 'index.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+gateway = load_gateway()
+
+from core.aio import AIO_ENABLED, close_pools as close_async_pools
+from core.db import close_pools
+
+USE_ASYNC_HANDLERS = SERVER_ASYNC_HANDLERS and AIO_ENABLED
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    # Created on first use so every worker process gets its own threads, even after a fork
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=SERVER_THREADS, thread_name_prefix='handler')
+    return _executor
+
+
+def header_name(name: str) -> str:
+    # Handlers look headers up as X-Admin-Token first, the way the platform passes them
+    return '-'.join(part.capitalize() for part in name.split('-'))
+
+
+def build_event(
+    method: str,
+    path: str,
+    query_string: str,
+    headers: Iterable[Tuple[str, str]],
+    body: bytes,
+    client_ip: str
+) -> Dict[str, Any]:
+    multi_headers: Dict[str, List[str]] = {}
+    for name, value in headers:
+        multi_headers.setdefault(header_name(name), []).append(value)
+
+    multi_params = parse_qs(query_string, keep_blank_values=True)
+
+    try:
+        text, is_base64 = body.decode(), False
+    except UnicodeDecodeError:
+        text, is_base64 = base64.b64encode(body).decode(), True
+
+    request_id = str(uuid.uuid4())
+    return {
+        'httpMethod': method,
+        'path': path,
+        'url': f'{path}?{query_string}' if query_string else path,
+        'headers': {name: ', '.join(values) for name, values in multi_headers.items()},
+        'multiValueHeaders': multi_headers,
+        'queryStringParameters': {name: values[-1] for name, values in multi_params.items()},
+        'multiValueQueryStringParameters': multi_params,
+        'requestContext': {
+            'identity': {'sourceIp': client_ip, 'userAgent': ', '.join(multi_headers.get('User-Agent', []))},
+            'httpMethod': method,
+            'requestId': request_id,
+            'requestTime': datetime.now(timezone.utc).strftime('%d/%b/%Y:%H:%M:%S +0000')
+        },
+        'body': text,
+        'isBase64Encoded': is_base64
+    }
+
+
+def error_response(status: int, message: str) -> Dict[str, Any]:
+    return {
+        'statusCode': status,
+        'headers': {'Content-Type': 'application/json', 'Access-Control-Allow-Origin': '*'},
+        'body': json.dumps({'error': message}),
+        'isBase64Encoded': False
+    }
+
+
+def handler_context(event: Dict[str, Any]) -> Any:
+    return types.SimpleNamespace(
+        request_id=event['requestContext']['requestId'],
+        function_name='api',
+        function_version='self-hosted',
+        memory_limit_in_mb=None
+    )
+
+
+def call_handler(event: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        return gateway.handler(event, handler_context(event))
+    except Exception:
+        logger.error('Unhandled error in %s %s\n%s', event['httpMethod'], event['path'], traceback.format_exc())
+        return error_response(500, 'Internal server error')
+
+
+async def call_async_handler(event: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        return await gateway.async_handler(event, handler_context(event))
+    except Exception:
+        logger.error('Unhandled error in %s %s\n%s', event['httpMethod'], event['path'], traceback.format_exc())
+        return error_response(500, 'Internal server error')
+
+
+def response_parts(response: Dict[str, Any]) -> Tuple[int, List[Tuple[str, str]], bytes]:
+    headers = [(name, str(value)) for name, value in (response.get('headers') or {}).items()]
+    for name, values in (response.get('multiValueHeaders') or {}).items():
+        headers.extend((name, str(value)) for value in values)
+
+    body = response.get('body') or ''
+    if response.get('isBase64Encoded'):
+        data = base64.b64decode(body)
+    else:
+        data = body.encode() if isinstance(body, str) else body
+
+    return int(response.get('statusCode', 200)), headers, data
+
+
+async def lifespan(receive: Any, send: Any) -> None:
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            # Sync fallbacks of the async handlers share the handler threads
+            asyncio.get_running_loop().set_default_executor(get_executor())
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            get_executor().shutdown(wait=True)
+            close_pools()
+            if AIO_ENABLED:
+                await close_async_pools()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope: Dict[str, Any], receive: Any, send: Any) -> None:
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+
+    chunks: List[bytes] = []
+    size = 0
+    more_body = True
+    while more_body:
+        message = await receive()
+        chunk = message.get('body', b'')
+        size += len(chunk)
+        if size > SERVER_MAX_BODY:
+            response = error_response(413, 'Request body too large')
+            break
+        chunks.append(chunk)
+        more_body = message.get('more_body', False)
+    else:
+        client = scope.get('client') or ('', 0)
+        event = build_event(
+            scope['method'],
+            scope['path'],
+            scope.get('query_string', b'').decode('latin-1'),
+            [(name.decode('latin-1'), value.decode('latin-1')) for name, value in scope.get('headers', [])],
+            b''.join(chunks),
+            client[0]
+        )
+        if USE_ASYNC_HANDLERS:
+            response = await call_async_handler(event)
+        else:
+            # psycopg2 blocks, so handlers run on the thread pool while the event loop keeps accepting requests
+            response = await asyncio.get_running_loop().run_in_executor(get_executor(), call_handler, event)
+
+    status, headers, data = response_parts(response)
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]
+    })
+    await send({'type': 'http.response.body', 'body': data})
+
+
+def wsgi_app(environ: Dict[str, Any], start_response: Any) -> List[bytes]:
+    # WSGI servers bring their own threads (gunicorn --threads), so handlers are called directly
+    length = int(environ.get('CONTENT_LENGTH') or 0)
+    if length > SERVER_MAX_BODY:
+        response = error_response(413, 'Request body too large')
+    else:
+        headers = [
+            (key[5:].replace('_', '-'), value) for key, value in environ.items() if key.startswith('HTTP_')
+        ]
+        if environ.get('CONTENT_TYPE'):
+            headers.append(('Content-Type', environ['CONTENT_TYPE']))
+
+        event = build_event(
+            environ['REQUEST_METHOD'],
+            environ.get('PATH_INFO') or '/',
+            environ.get('QUERY_STRING', ''),
+            headers,
+            environ['wsgi.input'].read(length) if length else b'',
+            environ.get('REMOTE_ADDR', '')
+        )
+        response = call_handler(event)
+
+    status, headers, data = response_parts(response)
+    try:
+        reason = HTTPStatus(status).phrase
+    except ValueError:
+        reason = ''
+    start_response(f'{status} {reason}', headers + [('Content-Length', str(len(data)))])
+    return [data]
+
+
+def main() -> int:
+    logging.basicConfig(level=logging.INFO)
+    try:
+        import uvicorn
+    except ImportError:
+        uvicorn = None
+
+    if uvicorn is not None:
+        uvicorn.run(
+            'serve:app',
+            app_dir=os.path.dirname(os.path.abspath(__file__)),
+            host=SERVER_HOST,
+            port=SERVER_PORT,
+            workers=SERVER_WORKERS
+        )
+        return 0
+
+    from socketserver import ThreadingMixIn
+    from wsgiref.simple_server import WSGIServer, make_server
+
+    class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+        daemon_threads = True
+
+    logger.warning('uvicorn is not installed: serving from one process with wsgiref')
+    with make_server(SERVER_HOST, SERVER_PORT, wsgi_app, server_class=ThreadingWSGIServer) as server:
+        server.serve_forever()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -12,7 +12,7 @@ interface Team {
   status: string;
   createdAt: string;
   isEdited?: boolean;
-  oldData?: any;
+  updatedAt?: string;
   topNick?: string;
   topTelegram?: string;
   jungleNick?: string;
@@ -64,6 +64,8 @@ interface AdminPanelProps {
   userRole: string;
   challongeUrl?: string;
   onChallongeUrlChange?: (url: string) => void;
+  teamsUrl?: string;
+  adminToken?: string;
 }
 
 export const AdminPanel = ({
@@ -84,7 +86,9 @@ export const AdminPanel = ({
   onEditApprovedTeam,
   userRole,
   challongeUrl,
-  onChallongeUrlChange
+  onChallongeUrlChange,
+  teamsUrl,
+  adminToken
 }: AdminPanelProps) => {
   return (
     <Dialog open={open} onOpenChange={onOpenChange}>
@@ -111,6 +115,8 @@ export const AdminPanel = ({
             onRejectTeam={onRejectTeam}
             onApprovePlayer={onApprovePlayer}
             onRejectPlayer={onRejectPlayer}
+            teamsUrl={teamsUrl}
+            adminToken={adminToken}
           />
 
           <ApprovedApplications 
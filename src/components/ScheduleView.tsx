@@ -1,7 +1,7 @@
 import { Card, CardContent, CardDescription, CardHeader, CardTitle } from '@/components/ui/card';
 import { Badge } from '@/components/ui/badge';
 import Icon from '@/components/ui/icon';
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 
 interface Match {
   id: number;
@@ -21,10 +21,20 @@ interface ScheduleViewProps {
   backendUrl: string;
 }
 
+const mergeMatches = (current: Match[], changed: Match[], deleted: number[]) => {
+  const byId = new Map(current.map(match => [match.id, match]));
+  deleted.forEach(id => byId.delete(id));
+  changed.forEach(match => byId.set(match.id, match));
+  return Array.from(byId.values()).sort((a, b) =>
+    `${a.match_date} ${a.match_time}`.localeCompare(`${b.match_date} ${b.match_time}`)
+  );
+};
+
 export const ScheduleView = ({ backendUrl }: ScheduleViewProps) => {
   const [matches, setMatches] = useState<Match[]>([]);
   const [loading, setLoading] = useState(true);
   const [published, setPublished] = useState(false);
+  const cursorRef = useRef(0);
 
   useEffect(() => {
     loadMatches();
@@ -34,22 +44,15 @@ export const ScheduleView = ({ backendUrl }: ScheduleViewProps) => {
 
   const loadMatches = async () => {
     try {
-      const publishedResponse = await fetch(`${backendUrl}?check_published=true`, {
-        mode: 'cors',
-        credentials: 'omit'
-      });
-      if (publishedResponse.ok) {
-        const publishedData = await publishedResponse.json();
-        setPublished(publishedData.published);
-      }
-
-      const response = await fetch(backendUrl, {
+      const response = await fetch(`${backendUrl}?since=${cursorRef.current}`, {
         mode: 'cors',
         credentials: 'omit'
       });
       if (response.ok) {
         const data = await response.json();
-        setMatches(data);
+        setPublished(data.published);
+        setMatches(prev => mergeMatches(data.full ? [] : prev, data.matches || [], data.deleted || []));
+        cursorRef.current = data.cursor || 0;
       }
     } catch (error) {
       console.error('Ошибка загрузки расписания:', error);
@@ -1,3 +1,4 @@
+import { useState, useEffect, useRef } from 'react';
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card';
 import { Button } from '@/components/ui/button';
 import { Badge } from '@/components/ui/badge';
@@ -11,7 +12,7 @@ interface Team {
   status: string;
   createdAt: string;
   isEdited?: boolean;
-  oldData?: any;
+  updatedAt?: string;
   topNick?: string;
   topTelegram?: string;
   jungleNick?: string;
@@ -51,6 +52,8 @@ interface PendingApplicationsProps {
   onRejectTeam: (teamId: number) => void;
   onApprovePlayer: (playerId: number) => void;
   onRejectPlayer: (playerId: number) => void;
+  teamsUrl?: string;
+  adminToken?: string;
 }
 
 export const PendingApplications = ({
@@ -59,8 +62,49 @@ export const PendingApplications = ({
   onApproveTeam,
   onRejectTeam,
   onApprovePlayer,
-  onRejectPlayer
+  onRejectPlayer,
+  teamsUrl,
+  adminToken
 }: PendingApplicationsProps) => {
+  const [previousData, setPreviousData] = useState<Record<number, Record<string, string>>>({});
+  // updatedAt of the team version each comparison was loaded for, so a captain's next edit reloads it
+  const loadedVersions = useRef<Record<number, string | undefined>>({});
+
+  useEffect(() => {
+    if (!teamsUrl || !adminToken) return;
+    pendingTeams
+      .filter((team) => team.isEdited && (!(team.id in loadedVersions.current) || loadedVersions.current[team.id] !== team.updatedAt))
+      .forEach((team) => {
+        loadedVersions.current[team.id] = team.updatedAt;
+        loadPreviousData(team.id);
+      });
+  }, [pendingTeams, teamsUrl, adminToken]);
+
+  const loadPreviousData = async (teamId: number) => {
+    try {
+      // Admin edits are revisions too; the comparison shows the captain's change under review
+      const response = await fetch(`${teamsUrl}?action=history&teamId=${teamId}&editedBy=captain&limit=1`, {
+        headers: {
+          'X-Auth-Token': adminToken || ''
+        }
+      });
+      if (response.ok) {
+        const data = await response.json();
+        const changes: Record<string, [string, string]> = data.revisions?.[0]?.changes || {};
+        const previous: Record<string, string> = {};
+        Object.entries(changes).forEach(([field, [oldValue]]) => {
+          previous[field] = oldValue;
+        });
+        setPreviousData((current) => ({ ...current, [teamId]: previous }));
+      } else {
+        delete loadedVersions.current[teamId];
+      }
+    } catch (error) {
+      delete loadedVersions.current[teamId];
+      console.error('Ошибка загрузки истории команды:', error);
+    }
+  };
+
   const renderFieldComparison = (label: string, oldValue: string | undefined, newValue: string | undefined) => {
     if (!oldValue || oldValue === newValue) return null;
     return (
@@ -121,29 +165,29 @@ export const PendingApplications = ({
                         </p>
                       </div>
                       
-                      {team.isEdited && team.oldData && (
+                      {team.isEdited && previousData[team.id] && (
                         <div className="bg-accent/5 border border-accent/20 rounded-lg p-3 space-y-2">
                           <div className="flex items-center gap-2 mb-2">
                             <Icon name="FileEdit" className="w-4 h-4 text-accent" />
                             <span className="text-sm font-semibold text-accent">Изменённые данные:</span>
                           </div>
-                          {renderFieldComparison('Название', team.oldData.teamName, team.teamName)}
-                          {renderFieldComparison('Капитан - Ник', team.oldData.captainNick, team.captainNick)}
-                          {renderFieldComparison('Капитан - Telegram', team.oldData.captainTelegram, team.captainTelegram)}
-                          {renderFieldComparison('Топ - Ник', team.oldData.topNick, team.topNick)}
-                          {renderFieldComparison('Топ - Telegram', team.oldData.topTelegram, team.topTelegram)}
-                          {renderFieldComparison('Лес - Ник', team.oldData.jungleNick, team.jungleNick)}
-                          {renderFieldComparison('Лес - Telegram', team.oldData.jungleTelegram, team.jungleTelegram)}
-                          {renderFieldComparison('Мид - Ник', team.oldData.midNick, team.midNick)}
-                          {renderFieldComparison('Мид - Telegram', team.oldData.midTelegram, team.midTelegram)}
-                          {renderFieldComparison('АДК - Ник', team.oldData.adcNick, team.adcNick)}
-                          {renderFieldComparison('АДК - Telegram', team.oldData.adcTelegram, team.adcTelegram)}
-                          {renderFieldComparison('Саппорт - Ник', team.oldData.supportNick, team.supportNick)}
-                          {renderFieldComparison('Саппорт - Telegram', team.oldData.supportTelegram, team.supportTelegram)}
-                          {renderFieldComparison('Запасной 1 - Ник', team.oldData.sub1Nick, team.sub1Nick)}
-                          {renderFieldComparison('Запасной 1 - Telegram', team.oldData.sub1Telegram, team.sub1Telegram)}
-                          {renderFieldComparison('Запасной 2 - Ник', team.oldData.sub2Nick, team.sub2Nick)}
-                          {renderFieldComparison('Запасной 2 - Telegram', team.oldData.sub2Telegram, team.sub2Telegram)}
+                          {renderFieldComparison('Название', previousData[team.id].teamName, team.teamName)}
+                          {renderFieldComparison('Капитан - Ник', previousData[team.id].captainNick, team.captainNick)}
+                          {renderFieldComparison('Капитан - Telegram', previousData[team.id].captainTelegram, team.captainTelegram)}
+                          {renderFieldComparison('Топ - Ник', previousData[team.id].topNick, team.topNick)}
+                          {renderFieldComparison('Топ - Telegram', previousData[team.id].topTelegram, team.topTelegram)}
+                          {renderFieldComparison('Лес - Ник', previousData[team.id].jungleNick, team.jungleNick)}
+                          {renderFieldComparison('Лес - Telegram', previousData[team.id].jungleTelegram, team.jungleTelegram)}
+                          {renderFieldComparison('Мид - Ник', previousData[team.id].midNick, team.midNick)}
+                          {renderFieldComparison('Мид - Telegram', previousData[team.id].midTelegram, team.midTelegram)}
+                          {renderFieldComparison('АДК - Ник', previousData[team.id].adcNick, team.adcNick)}
+                          {renderFieldComparison('АДК - Telegram', previousData[team.id].adcTelegram, team.adcTelegram)}
+                          {renderFieldComparison('Саппорт - Ник', previousData[team.id].supportNick, team.supportNick)}
+                          {renderFieldComparison('Саппорт - Telegram', previousData[team.id].supportTelegram, team.supportTelegram)}
+                          {renderFieldComparison('Запасной 1 - Ник', previousData[team.id].sub1Nick, team.sub1Nick)}
+                          {renderFieldComparison('Запасной 1 - Telegram', previousData[team.id].sub1Telegram, team.sub1Telegram)}
+                          {renderFieldComparison('Запасной 2 - Ник', previousData[team.id].sub2Nick, team.sub2Nick)}
+                          {renderFieldComparison('Запасной 2 - Telegram', previousData[team.id].sub2Telegram, team.sub2Telegram)}
                         </div>
                       )}
                     </div>
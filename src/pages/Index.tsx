@@ -1,4 +1,4 @@
-import { useState, useEffect } from 'react';
+import { useState, useEffect, useRef } from 'react';
 import { Tabs, TabsContent, TabsList, TabsTrigger } from '@/components/ui/tabs';
 import { Button } from '@/components/ui/button';
 import { useToast } from '@/hooks/use-toast';
@@ -88,15 +88,55 @@ const Index = () => {
     friend2Roles: [] as string[]
   });
   const { toast } = useToast();
+  const bootstrapVersions = useRef<Record<string, number>>({});
 
   useEffect(() => {
+    loadBootstrap();
+  }, [isLoggedIn]);
+
+  const loadBootstrap = async () => {
+    try {
+      const params = new URLSearchParams({ action: 'bootstrap' });
+      const versions = bootstrapVersions.current;
+      if (versions.teams !== undefined) params.set('teamsVersion', String(versions.teams));
+      if (versions.players !== undefined) params.set('playersVersion', String(versions.players));
+      if (versions.settings !== undefined) params.set('settingsVersion', String(versions.settings));
+
+      const response = await fetch(`${BACKEND_URLS.teams}?${params}`, {
+        mode: 'cors',
+        credentials: 'omit'
+      });
+      if (!response.ok) {
+        loadSections();
+        return;
+      }
+      const data = await response.json();
+
+      if (data.approvedTeams) {
+        setApprovedTeams(data.approvedTeams);
+        setPendingTeams(data.pendingTeams || []);
+      }
+      if (data.players) {
+        setIndividualPlayers(data.players.filter((p: any) => p.status === 'approved'));
+        setPendingPlayers(data.players.filter((p: any) => p.status === 'pending'));
+      }
+      if (data.settings) {
+        applySettings(data.settings);
+      }
+      bootstrapVersions.current = data.versions || {};
+    } catch (error) {
+      loadSections();
+    }
+  };
+
+  const loadSections = () => {
     loadApprovedTeams();
     loadIndividualPlayers();
     loadSettings();
     if (isLoggedIn) {
       loadPendingTeams();
     }
-  }, [isLoggedIn]);
+  };
 
   const loadApprovedTeams = async () => {
     try {
@@ -165,23 +205,27 @@ const Index = () => {
         return;
       }
       const data = await response.json();
-      setRegistrationOpen(data.settings?.registration_open === 'true');
-      setChallongeUrl(data.settings?.challonge_url || '');
-      setHomeTitle(data.settings?.home_title || 'League of Legends: Wild Rift');
-      setHomeSubtitle(data.settings?.home_subtitle || 'Турнир 5x5');
-      setHomeDescription(data.settings?.home_description || 'Соберите команду и докажите своё мастерство в «Диком ущелье»');
-      
-      try {
-        const info = JSON.parse(data.settings?.tournament_info || '{}');
-        setTournamentInfo(info);
-      } catch {
-        setTournamentInfo({});
-      }
+      applySettings(data.settings || {});
     } catch (error) {
       setRegistrationOpen(true);
     }
   };
 
+  const applySettings = (settings: Record<string, string>) => {
+    setRegistrationOpen(settings.registration_open === 'true');
+    setChallongeUrl(settings.challonge_url || '');
+    setHomeTitle(settings.home_title || 'League of Legends: Wild Rift');
+    setHomeSubtitle(settings.home_subtitle || 'Турнир 5x5');
+    setHomeDescription(settings.home_description || 'Соберите команду и докажите своё мастерство в «Диком ущелье»');
+
+    try {
+      const info = JSON.parse(settings.tournament_info || '{}');
+      setTournamentInfo(info);
+    } catch {
+      setTournamentInfo({});
+    }
+  };
+
   const handleLogin = async (telegram: string, password: string) => {
     try {
       const adminResponse = await fetch(BACKEND_URLS.auth, {
@@ -255,6 +299,15 @@ const Index = () => {
   };
 
   const handleLogout = () => {
+    if (isAdmin && sessionToken) {
+      fetch(BACKEND_URLS.auth, {
+        method: 'POST',
+        mode: 'cors',
+        credentials: 'omit',
+        headers: { 'Content-Type': 'application/json', 'X-Auth-Token': sessionToken },
+        body: JSON.stringify({ action: 'logout' })
+      }).catch(() => {});
+    }
     setIsLoggedIn(false);
     setIsAdmin(false);
     setIsSuperAdmin(false);
@@ -868,6 +921,8 @@ const Index = () => {
           userRole={userRole}
           challongeUrl={challongeUrl}
           onChallongeUrlChange={handleChallongeUrlChange}
+          teamsUrl={BACKEND_URLS.teams}
+          adminToken={sessionToken}
         />
       )}
 
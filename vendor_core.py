@@ -0,0 +1,94 @@
+'''
+Business: Package the shared backend/core library into every cloud function before deploy
+Args: --check - only verify the vendored copies and exit 1 when any is missing or stale
+Returns: every backend/<function>/ carries its own core/, the api gateway also its function handlers under functions/
+'''
+
+import filecmp
+import os
+import shutil
+import sys
+from typing import Dict, List
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.join(ROOT_DIR, 'backend')
+CORE_DIR = os.path.join(BACKEND_DIR, 'core')
+GATEWAY = 'api'
+
+IGNORED = shutil.ignore_patterns('__pycache__', '*.pyc')
+
+
+def function_names() -> List[str]:
+    # Every directory with an index.py is deployed as a function of its own
+    return sorted(
+        name for name in os.listdir(BACKEND_DIR)
+        if os.path.isfile(os.path.join(BACKEND_DIR, name, 'index.py'))
+    )
+
+
+def source_files(directory: str) -> Dict[str, str]:
+    files = {}
+    for root, dirs, names in os.walk(directory):
+        dirs[:] = [d for d in dirs if d != '__pycache__']
+        for name in names:
+            if not name.endswith('.pyc'):
+                path = os.path.join(root, name)
+                files[os.path.relpath(path, directory)] = path
+    return files
+
+
+def copies() -> Dict[str, str]:
+    # target directory -> source directory
+    names = function_names()
+    targets = {os.path.join(BACKEND_DIR, name, 'core'): CORE_DIR for name in names}
+    for name in names:
+        if name != GATEWAY:
+            targets[os.path.join(BACKEND_DIR, GATEWAY, 'functions', name)] = os.path.join(BACKEND_DIR, name)
+    return targets
+
+
+def gateway_function_files(source: str) -> Dict[str, str]:
+    return {rel: path for rel, path in source_files(source).items() if rel == 'index.py'}
+
+
+def stale_copies() -> List[str]:
+    stale = []
+    for target, source in copies().items():
+        expected = source_files(source) if source == CORE_DIR else gateway_function_files(source)
+        actual = source_files(target) if os.path.isdir(target) else {}
+        if set(expected) != set(actual) or any(
+            not filecmp.cmp(path, actual[rel], shallow=False) for rel, path in expected.items()
+        ):
+            stale.append(os.path.relpath(target, ROOT_DIR))
+    return stale
+
+
+def vendor() -> None:
+    for target, source in copies().items():
+        if os.path.isdir(target):
+            shutil.rmtree(target)
+        if source == CORE_DIR:
+            shutil.copytree(source, target, ignore=IGNORED)
+        else:
+            os.makedirs(target)
+            shutil.copy2(os.path.join(source, 'index.py'), os.path.join(target, 'index.py'))
+
+
+def main() -> int:
+    if '--check' in sys.argv[1:]:
+        stale = stale_copies()
+        for path in stale:
+            print(f'stale  {path}')
+        if stale:
+            print('run python vendor_core.py and commit the result')
+            return 1
+        print('vendored copies are up to date')
+        return 0
+
+    vendor()
+    print('\n'.join(f'vendored {os.path.relpath(t, ROOT_DIR)}' for t in copies()))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())